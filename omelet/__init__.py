@@ -6,9 +6,22 @@ __version__ = "0.1.0"
 
 from .cli import cli
 from .markdown_processor import MarkdownProcessor
-from .gcs_uploader import GCSUploader
 from .config import Config
-from .ghost_client import GhostClient
-from .gemini_image import GeminiImageGenerator
+
+# Submodules that pull in heavy SDKs (google-cloud-storage, google-genai,
+# markdown/jwt) are only imported when their class is first accessed.
+_LAZY_IMPORTS = {
+    'GCSUploader': '.gcs_uploader',
+    'GhostClient': '.ghost_client',
+    'GeminiImageGenerator': '.gemini_image',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        from importlib import import_module
+        return getattr(import_module(_LAZY_IMPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = ['cli', 'MarkdownProcessor', 'GCSUploader', 'Config', 'GhostClient', 'GeminiImageGenerator']
\ No newline at end of file
@@ -3,17 +3,39 @@ QuillBot AI Content Detector module.
 Checks text and LaTeX papers for AI-generated content using QuillBot's API.
 """
 
+import hashlib
+import json
 import re
-from typing import Optional
+import string
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence, Tuple, TypeVar, Union
 
 import click
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .hashcache import CACHE_DIR, JsonCache, file_stamp, replace_file
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
 
 BASE_URL = "https://quillbot.com"
 SCORE_ENDPOINT = f"{BASE_URL}/api/ai-detector/score"
 LANG_ENDPOINT = f"{BASE_URL}/api/utils/detect-language"
 TEXT_UPPER_LIMIT = 30000
 TEXT_LOWER_LIMIT = 3
+SECTION_WORKERS = 4
+CHUNK_OVERLAP = 200
+LANG_SAMPLE_SIZE = 500
+# Detected languages persisted across runs, keyed by a hash of the sample
+LANG_CACHE = JsonCache(CACHE_DIR / "lang.json")
+# Parsed LaTeX, one file per source, reused until it (or the parser) changes
+LATEX_CACHE_DIR = CACHE_DIR / "latex"
 
 HEADERS_BASE = {
     "accept": "application/json, text/plain, */*",
@@ -26,159 +48,474 @@ HEADERS_BASE = {
     "referer": "https://quillbot.com/ai-content-detector",
 }
 
+# Shared keep-alive session: detect_language and every check_ai_score call hit
+# the same host, so they reuse one pooled TLS connection instead of opening a
+# new one per request. Transient gateway errors and rate limiting (429, which
+# concurrent section checks can trigger) are retried with exponential backoff,
+# honouring Retry-After when the server sends one.
+_SESSION = requests.Session()
+_SESSION.headers.update(HEADERS_BASE)
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=frozenset({"POST"}),
+            raise_on_status=False,
+        ),
+    ),
+)
+
+
+_Repl = Union[str, Callable[[re.Match], str]]
+
+
+def _fuse(
+    branches: Sequence[Tuple[str, str]], flags: int = 0
+) -> Tuple[re.Pattern, _Repl]:
+    """Compile ordered (pattern, replacement) branches into one alternation.
+
+    Returns the compiled pattern and a replacement for ``pattern.sub``. A
+    replacement may contain ``{}``, which is filled with the branch's first
+    capture group. Earlier branches win when several match at one position.
+    """
+    if len(branches) == 1:
+        pattern, repl = branches[0]
+        return re.compile(pattern, flags), repl.replace("{}", r"\1")
+
+    # Hoisting the shared leading backslash keeps the literal-prefix scan that
+    # sre would otherwise lose on an alternation.
+    prefix = ""
+    if all(pattern.startswith("\\\\") for pattern, _ in branches):
+        prefix = "\\\\"
+        branches = [(pattern[2:], repl) for pattern, repl in branches]
+
+    repls = {repl for _, repl in branches}
+    if len(repls) == 1 and "{}" not in branches[0][1]:
+        alternation = "|".join(pattern for pattern, _ in branches)
+        return re.compile(prefix + "(?:" + alternation + ")", flags), repls.pop()
+
+    parts = []
+    actions = {}
+    group = 1
+    for index, (pattern, repl) in enumerate(branches):
+        name = f"b{index}"
+        parts.append(f"(?P<{name}>{pattern})")
+        actions[name] = (repl, group + 1, "{}" in repl)
+        group += 1 + re.compile(pattern).groups
+    fused = re.compile(prefix + "(?:" + "|".join(parts) + ")", flags)
+
+    def dispatch(match: re.Match) -> str:
+        repl, inner, has_group = actions[match.lastgroup]
+        return repl.format(match.group(inner)) if has_group else repl
+
+    return fused, dispatch
+
+
+_COMMENT_RE = re.compile(r"(?<!\\)%.*$", re.MULTILINE)
+
+# Environments handled by a single token scan rather than a begin and an end
+# pattern each. Span environments are replaced whole, up to their matching
+# \end; the others only lose their \begin/\end markers (and options).
+_ENV_RE = re.compile(
+    r"\\(begin|end)\{(document|figure|table|tabular|itemize|enumerate"
+    r"|equation|align|gather|thebibliography)(\*?)\}"
+)
+_ENV_SPANS = {
+    "equation": "[formula]",
+    "align": "[formula]",
+    "gather": "[formula]",
+    "thebibliography": "",
+}
 
-def strip_latex(text: str) -> str:
-    """Strip LaTeX commands and environments, keeping readable text."""
-    # Remove comments
-    text = re.sub(r"(?<!\\)%.*$", "", text, flags=re.MULTILINE)
-
-    # Remove document class, usepackage, etc.
-    text = re.sub(
-        r"\\(documentclass|usepackage|newacronym|bibliographystyle)\b[^}]*\{[^}]*\}(\{[^}]*\})?",
-        "",
-        text,
-    )
-    text = re.sub(r"\\(label|ref|cite|eqref|pageref|footnote)\{[^}]*\}", "", text)
-
-    # Remove begin/end document
-    text = re.sub(r"\\begin\{document\}", "", text)
-    text = re.sub(r"\\end\{document\}", "", text)
-
-    # Remove figure/table environments but keep captions
-    text = re.sub(r"\\begin\{(figure|table)\}\[?[^\]]*\]?", "", text)
-    text = re.sub(r"\\end\{(figure|table)\}", "", text)
-    text = re.sub(r"\\includegraphics[^}]*\{[^}]*\}", "", text)
-    text = re.sub(r"\\centering", "", text)
-    text = re.sub(r"\\resizebox\{[^}]*\}\{[^}]*\}\{", "", text)
-
-    # Remove tabular environments
-    text = re.sub(r"\\begin\{tabular\}\{[^}]*\}", "", text)
-    text = re.sub(r"\\end\{tabular\}", "", text)
-    text = re.sub(r"\\(toprule|midrule|bottomrule|hline)", "", text)
-    text = re.sub(r"\\multirow\{[^}]*\}\{[^}]*\}", "", text)
-
-    # Remove math environments but keep inline math text
-    text = re.sub(r"\\\[.*?\\\]", "[formula]", text, flags=re.DOTALL)
-    text = re.sub(
-        r"\\begin\{(equation|align|gather)\*?\}.*?\\end\{(equation|align|gather)\*?\}",
-        "[formula]",
-        text,
-        flags=re.DOTALL,
-    )
 
+def _skip_group(text: str, pos: int, opener: str, closer: str) -> int:
+    """Return the index past a group like ``[...]`` starting at pos, else pos."""
+    if text.startswith(opener, pos):
+        close = text.find(closer, pos + 1)
+        if close != -1:
+            return close + 1
+    return pos
+
+
+def _strip_environments(text: str) -> str:
+    """Remove environment markers and whole math/bibliography environments.
+
+    Options are only skipped when the marker is directly followed by one, so
+    ``\\begin{itemize}`` no longer swallows text up to the next ``]``.
+    """
+    out = []
+    pos = 0
+    unterminated = set()  # end markers known to be absent past this point
+    while True:
+        match = _ENV_RE.search(text, pos)
+        if match is None:
+            break
+        kind, name, star = match.groups()
+        out.append(text[pos : match.start()])
+        end = match.end()
+        if kind == "begin":
+            if name in _ENV_SPANS:
+                end_marker = f"\\end{{{name}{star}}}"
+                close = -1 if end_marker in unterminated else text.find(end_marker, end)
+                if close == -1:
+                    # Unterminated, leave the marker for _strip_commands
+                    unterminated.add(end_marker)
+                    out.append(match.group())
+                    pos = end
+                    continue
+                out.append(_ENV_SPANS[name])
+                end = close + len(end_marker)
+            elif name == "tabular":
+                end = _skip_group(text, end, "{", "}")
+            elif name != "document":
+                end = _skip_group(text, end, "[", "]")
+        pos = end
+    out.append(text[pos:])
+    return "".join(out)
+
+
+def _strip_display_math(text: str) -> str:
+    """Replace each ``\\[ ... \\]`` block with [formula], keeping inline math.
+
+    A str.find cursor rather than a lazy DOTALL regex, which rescanned to the
+    end of the text for every opener without a closer (e.g. each ``\\\\[2pt]``
+    row break in a table).
+    """
+    out = []
+    pos = 0
+    while True:
+        start = text.find("\\[", pos)
+        if start == -1:
+            break
+        close = text.find("\\]", start + 2)
+        if close == -1:
+            # No closer after this opener means none after any later one
+            break
+        out.append(text[pos:start])
+        out.append("[formula]")
+        pos = close + 2
+    out.append(text[pos:])
+    return "".join(out)
+
+
+# strip_latex runs these stages in order, after comments, environments and
+# display math are gone. Each stage is one pass over the text; patterns are
+# only fused with their neighbours, since later stages rely on the output of
+# earlier ones (e.g. \section{\textbf{x}} needs textbf gone first).
+# Within a stage, branches all see that stage's input, so a command nested
+# in another one from the same stage (\textit{\textbf{x}}) is only partly
+# converted here and left to _strip_commands.
+_LATEX_STAGES = [
+    _fuse(
+        [
+            # Remove document class, usepackage, etc.
+            (
+                r"\\(documentclass|usepackage|newacronym|bibliographystyle)\b[^}]*\{[^}]*\}(\{[^}]*\})?",
+                "",
+            ),
+            (r"\\(label|ref|cite|eqref|pageref|footnote)\{[^}]*\}", ""),
+            # Figure/table contents other than captions
+            (r"\\includegraphics[^}]*\{[^}]*\}", ""),
+            (r"\\centering", ""),
+            (r"\\resizebox\{[^}]*\}\{[^}]*\}\{", ""),
+            # Table rules
+            (r"\\(toprule|midrule|bottomrule|hline)", ""),
+            (r"\\multirow\{[^}]*\}\{[^}]*\}", ""),
+        ]
+    ),
     # Convert LaTeX formatting to plain text
-    text = re.sub(r"\\textbf\{([^}]*)\}", r"\1", text)
-    text = re.sub(r"\\textit\{([^}]*)\}", r"\1", text)
-    text = re.sub(r"\\texttt\{([^}]*)\}", r"\1", text)
-    text = re.sub(r"\\emph\{([^}]*)\}", r"\1", text)
-    text = re.sub(r"\\detokenize\{([^}]*)\}", r"\1", text)
-
-    # Remove title, author, institute, etc.
-    text = re.sub(
-        r"\\(title|titlerunning|author|authorrunning|institute|email|maketitle|keywords)\b(\[[^\]]*\])?\{",
-        "",
-        text,
-    )
+    _fuse(
+        [
+            (r"\\textbf\{([^}]*)\}", "{}"),
+            (r"\\textit\{([^}]*)\}", "{}"),
+            (r"\\texttt\{([^}]*)\}", "{}"),
+            (r"\\emph\{([^}]*)\}", "{}"),
+            (r"\\detokenize\{([^}]*)\}", "{}"),
+        ]
+    ),
+    _fuse(
+        [
+            # Remove title, author, institute, etc.
+            (
+                r"\\(title|titlerunning|author|authorrunning|institute|email|maketitle|keywords)\b(\[[^\]]*\])?\{",
+                "",
+            ),
+            # Convert sections
+            (r"\\section\*?\{([^}]*)\}", "\n\n{}\n"),
+            (r"\\subsection\*?\{([^}]*)\}", "\n{}\n"),
+            (r"\\subsubsection\*?\{([^}]*)\}", "\n{}\n"),
+            # Convert list items
+            (r"\\item", "- "),
+        ]
+    ),
+    # Remove caption command but keep text. A stage of its own: captions
+    # often hold sections or items, which must be converted first.
+    _fuse([(r"\\caption\{([^}]*)\}", "{}")]),
+    # Remove remaining LaTeX commands
+    _fuse(
+        [
+            (r"\\(gls|Gls|acrshort|acrlong|acrfull)\{[^}]*\}", "LLMs"),
+            (r"\\(smallskip|medskip|bigskip|newline|newpage|clearpage|pagebreak)", ""),
+            (r"\\(inst|and)\{?\d*\}?", ""),
+        ]
+    ),
+]
+
+_COMMAND_LETTERS = frozenset(string.ascii_letters)
+
+
+def _strip_commands(text: str, unwrap: bool = True) -> str:
+    """Drop any remaining ``\\name`` commands, keeping their first argument.
+
+    ``\\name{arg}`` becomes ``arg`` (itself stripped of bare command names)
+    and a bare ``\\name`` is removed. This is a single scan that jumps
+    between backslashes with str.find instead of two regex passes.
+    """
+    out = []
+    pos = 0
+    end_of_text = len(text)
+    while True:
+        start = text.find("\\", pos)
+        if start == -1:
+            break
+        out.append(text[pos:start])
+        end = start + 1
+        while end < end_of_text and text[end] in _COMMAND_LETTERS:
+            end += 1
+        if end == start + 1:
+            # Not a command name (e.g. "\\%"), keep the backslash
+            out.append("\\")
+            pos = end
+            continue
+        if unwrap and end < end_of_text and text[end] == "{":
+            close = text.find("}", end + 1)
+            if close != -1:
+                out.append(_strip_commands(text[end + 1 : close], unwrap=False))
+                pos = close + 1
+                continue
+        pos = end
+    out.append(text[pos:])
+    return "".join(out)
+
+
+# Remaining braces and special characters: single characters go through
+# str.translate, the rest through one alternation ("---" before "--" so it wins).
+_CHAR_TABLE = str.maketrans({"{": None, "}": None, "~": " ", "&": " "})
+_PUNCT_RE = re.compile(r"``|''|---|--|\\\\")
+_PUNCT = {"``": '"', "''": '"', "---": "\u2014", "--": "\u2013", "\\\\": "\n"}
+
+
+def _replace_punct(match: re.Match) -> str:
+    return _PUNCT[match.group()]
+
+
+# Newline runs and space/tab runs are collapsed in one pass. Runs that are
+# already a single space are left unmatched. Whitespace-only lines are blanked
+# afterwards: that pattern spans newlines, so it must see the collapsed text.
+_WHITESPACE_RE = re.compile(r"\n{3,}|[ \t]{2,}|\t")
+_BLANK_LINE_RE = re.compile(r"^\s+$", re.MULTILINE)
+
+
+def _collapse_whitespace(match: re.Match) -> str:
+    return "\n\n" if match.group()[0] == "\n" else " "
 
-    # Convert sections
-    text = re.sub(r"\\section\*?\{([^}]*)\}", r"\n\n\1\n", text)
-    text = re.sub(r"\\subsection\*?\{([^}]*)\}", r"\n\1\n", text)
-    text = re.sub(r"\\subsubsection\*?\{([^}]*)\}", r"\n\1\n", text)
-
-    # Convert lists
-    text = re.sub(r"\\begin\{(itemize|enumerate)\}\[?[^\]]*\]?", "", text)
-    text = re.sub(r"\\end\{(itemize|enumerate)\}", "", text)
-    text = re.sub(r"\\item", "- ", text)
-
-    # Remove caption command but keep text
-    text = re.sub(r"\\caption\{([^}]*)\}", r"\1", text)
-
-    # Remove bibliography
-    text = re.sub(
-        r"\\begin\{thebibliography\}.*?\\end\{thebibliography\}",
-        "",
-        text,
-        flags=re.DOTALL,
-    )
 
-    # Remove remaining LaTeX commands
-    text = re.sub(r"\\(gls|Gls|acrshort|acrlong|acrfull)\{[^}]*\}", "LLMs", text)
-    text = re.sub(
-        r"\\(smallskip|medskip|bigskip|newline|newpage|clearpage|pagebreak)", "", text
-    )
-    text = re.sub(r"\\(inst|and)\{?\d*\}?", "", text)
-    text = re.sub(r"\\[a-zA-Z]+\{([^}]*)\}", r"\1", text)
-    text = re.sub(r"\\[a-zA-Z]+", "", text)
-
-    # Remove remaining braces
-    text = re.sub(r"[{}]", "", text)
-
-    # Clean up special characters
-    text = text.replace("~", " ")
-    text = text.replace("``", '"')
-    text = text.replace("''", '"')
-    text = text.replace("---", "\u2014")
-    text = text.replace("--", "\u2013")
-    text = text.replace("\\\\", "\n")
-    text = text.replace("&", " ")
+def strip_latex(text: str) -> str:
+    """Strip LaTeX commands and environments, keeping readable text."""
+    text = _strip_environments(_COMMENT_RE.sub("", text))
+    text = _strip_display_math(text)
+    for pattern, repl in _LATEX_STAGES:
+        text = pattern.sub(repl, text)
+    text = _strip_commands(text)
+
+    # Remove remaining braces and clean up special characters
+    text = text.translate(_CHAR_TABLE)
+    text = _PUNCT_RE.sub(_replace_punct, text)
 
     # Clean up whitespace
-    text = re.sub(r"\n{3,}", "\n\n", text)
-    text = re.sub(r"[ \t]+", " ", text)
-    text = re.sub(r"^\s+$", "", text, flags=re.MULTILINE)
+    text = _WHITESPACE_RE.sub(_collapse_whitespace, text)
+    text = _BLANK_LINE_RE.sub("", text)
 
     return text.strip()
 
 
+_SECTION_RE = re.compile(
+    r"\\section\*?\{([^}]*)\}(.*?)(?=\\section\*?\{|\\end\{document\}|$)", re.DOTALL
+)
+_ABSTRACT_RE = re.compile(r"\\begin\{abstract\}(.*?)\\end\{abstract\}", re.DOTALL)
+
+
 def extract_sections(tex_content: str) -> dict[str, str]:
     """Extract named sections from LaTeX content."""
-    sections = {}
-    pattern = r"\\section\*?\{([^}]*)\}(.*?)(?=\\section\*?\{|\\end\{document\}|$)"
-    matches = re.finditer(pattern, tex_content, re.DOTALL)
-    for m in matches:
-        name = m.group(1).strip().lower()
-        body = m.group(2).strip()
-        sections[name] = strip_latex(body)
+    sections = {
+        m.group(1).strip().lower(): strip_latex(m.group(2).strip())
+        for m in _SECTION_RE.finditer(tex_content)
+    }
 
     # Also extract abstract
-    abstract_match = re.search(
-        r"\\begin\{abstract\}(.*?)\\end\{abstract\}", tex_content, re.DOTALL
-    )
+    abstract_match = _ABSTRACT_RE.search(tex_content)
     if abstract_match:
         sections["abstract"] = strip_latex(abstract_match.group(1))
 
     return sections
 
 
+@lru_cache(maxsize=1)
+def _parser_version() -> str:
+    """Hash of this module's source, so any change to the parser (the stage
+    tables or the _strip_* helpers) invalidates cached results."""
+    try:
+        source = Path(__file__).read_bytes()
+    except OSError:
+        from . import __version__
+
+        return __version__
+    return hashlib.blake2b(source, digest_size=8).hexdigest()
+
+
+_T = TypeVar("_T")
+
+
+def _parse_latex_file(path: Path, kind: str, parse: Callable[[str], _T]) -> _T:
+    """Return parse(file content), cached on disk until the file changes.
+
+    Each source file gets its own cache file, stamped with the source's
+    mtime/size and the parser version, holding one result per kind,
+    computed the first time it is asked for.
+    """
+    stamp = [_parser_version(), *file_stamp(path)]
+    key = hashlib.blake2b(str(path.resolve()).encode("utf-8"), digest_size=16).hexdigest()
+    cache_path = LATEX_CACHE_DIR / f"{key}.json"
+
+    try:
+        entry = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        entry = None
+    if not isinstance(entry, dict) or entry.get("stamp") != stamp:
+        entry = {"stamp": stamp}
+    if kind in entry:
+        return entry[kind]
+
+    # Read after the stat, so an edit in between leaves a stale stamp rather
+    # than a stale result
+    entry[kind] = parse(path.read_text(encoding="utf-8"))
+    try:
+        LATEX_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        replace_file(cache_path, json.dumps(entry))
+    except OSError:
+        pass
+    return entry[kind]
+
+
+def load_sections(path: Path) -> dict[str, str]:
+    """extract_sections for a .tex file, cached across runs."""
+    return _parse_latex_file(path, "sections", extract_sections)
+
+
+def load_stripped(path: Path) -> str:
+    """strip_latex for a .tex file, cached across runs."""
+    return _parse_latex_file(path, "stripped", strip_latex)
+
+
+def _post_json(url: str, payload: dict, token: str, timeout: int) -> requests.Response:
+    """POST a JSON payload to QuillBot, encoding it with orjson when installed."""
+    headers = {"useridtoken": token}
+    if orjson is not None:
+        return _SESSION.post(url, data=orjson.dumps(payload), headers=headers, timeout=timeout)
+    return _SESSION.post(url, json=payload, headers=headers, timeout=timeout)
+
+
+def _load_json(resp: requests.Response) -> Any:
+    """Decode a JSON response body, with orjson when installed."""
+    if orjson is not None:
+        return orjson.loads(resp.content)
+    return resp.json()
+
+
+@lru_cache(maxsize=128)
+def _detect_language_sample(sample: str, token: str) -> tuple[str, str]:
+    """Detect the language of one sample; failures raise and are not cached."""
+    resp = _post_json(LANG_ENDPOINT, {"text": sample}, token, timeout=30)
+    resp.raise_for_status()
+    data = _load_json(resp)
+    return data.get("language", "en"), data.get("languageName", "English")
+
+
 def detect_language(text: str, token: str) -> tuple[str, str]:
     """Detect language of text using QuillBot API."""
-    headers = {**HEADERS_BASE, "useridtoken": token}
-    sample = text[:500]
+    sample = text[:LANG_SAMPLE_SIZE]
+    key = hashlib.sha256(sample.encode("utf-8")).hexdigest()
+    cached = LANG_CACHE.get(key)
+    if cached:
+        return tuple(cached)
+
     try:
-        resp = requests.post(
-            LANG_ENDPOINT, json={"text": sample}, headers=headers, timeout=30
-        )
-        resp.raise_for_status()
-        data = resp.json()
-        return data.get("language", "en"), data.get("languageName", "English")
+        result = _detect_language_sample(sample, token)
     except Exception as e:
         click.echo(f"  Language detection failed ({e}), defaulting to English")
         return "en", "English"
 
+    if len(sample) >= TEXT_LOWER_LIMIT:
+        LANG_CACHE.set(key, list(result))
+    return result
 
-def check_ai_score(
-    text: str, token: str, language: str = "en", explain: bool = True
-) -> dict:
-    """Check text for AI content using QuillBot API."""
-    if len(text) < TEXT_LOWER_LIMIT:
-        return {"error": "Text too short (min 3 characters)"}
-    if len(text) > TEXT_UPPER_LIMIT:
-        click.echo(
-            f"  Warning: Text exceeds {TEXT_UPPER_LIMIT} chars ({len(text)}), truncating..."
-        )
-        text = text[:TEXT_UPPER_LIMIT]
 
-    headers = {**HEADERS_BASE, "useridtoken": token}
+def _chunk_text(
+    text: str, size: int = TEXT_UPPER_LIMIT, overlap: int = CHUNK_OVERLAP
+) -> list[str]:
+    """Split text into pieces of at most size chars, overlapping by overlap."""
+    step = size - overlap
+    return [text[i : i + size] for i in range(0, len(text) - overlap, step)]
+
+
+def _split_text(text: str) -> list[str]:
+    """Pieces to score for text: itself, or overlapping chunks if too long."""
+    if len(text) <= TEXT_UPPER_LIMIT:
+        return [text]
+    pieces = _chunk_text(text)
+    click.echo(
+        f"  Text exceeds {TEXT_UPPER_LIMIT} chars ({len(text)}), "
+        f"checking in {len(pieces)} chunks..."
+    )
+    return pieces
+
+
+def _merge_scores(
+    results: list[dict], pieces: list[str], overlap: int = CHUNK_OVERLAP
+) -> dict:
+    """Combine per-piece results, weighting aiScore by each piece's new text.
+
+    Every piece after the first repeats the last overlap chars of the one
+    before it; detector chunks starting in that repeated part are dropped
+    and it does not count towards the weights.
+    """
+    if len(results) == 1:
+        return results[0]
+    for result in results:
+        if "error" in result:
+            return result
+    values = [r.get("data", {}).get("value", r.get("data", r)) for r in results]
+    lengths = [len(piece) - (overlap if i else 0) for i, piece in enumerate(pieces)]
+    merged = dict(values[0])
+    merged["aiScore"] = sum(
+        v.get("aiScore", v.get("totalAiScore", 0)) * n for v, n in zip(values, lengths)
+    ) / sum(lengths)
+    merged["chunks"] = [
+        c
+        for i, (v, piece) in enumerate(zip(values, pieces))
+        for c in v.get("chunks", [])
+        if not i or not 0 <= piece.find(c.get("text", "")) < overlap
+    ]
+    return {"data": {"value": merged}}
+
+
+def _score_text(text: str, token: str, language: str, explain: bool) -> dict:
+    """Score one piece of at most TEXT_UPPER_LIMIT chars with the QuillBot API."""
     body = {
         "text": text,
         "language": language,
@@ -186,18 +523,75 @@ def check_ai_score(
     }
 
     try:
-        resp = requests.post(
-            SCORE_ENDPOINT, json=body, headers=headers, timeout=120
-        )
-        resp.raise_for_status()
-        return resp.json()
-    except requests.exceptions.HTTPError as e:
-        status = e.response.status_code if e.response else "unknown"
-        body_text = e.response.text[:500] if e.response else ""
-        return {"error": f"HTTP {status}: {body_text}", "status": status}
-    except Exception as e:
+        resp = _post_json(SCORE_ENDPOINT, body, token, timeout=120)
+    except requests.exceptions.RequestException as e:
         return {"error": str(e)}
 
+    if resp.status_code >= 400:
+        return {
+            "error": f"HTTP {resp.status_code}: {resp.text[:500]}",
+            "status": resp.status_code,
+        }
+    try:
+        return _load_json(resp)
+    except ValueError as e:
+        return {"error": f"Invalid JSON response: {e}"}
+
+
+def check_ai_score(
+    text: str, token: str, language: str = "en", explain: bool = True
+) -> dict:
+    """Check text for AI content using QuillBot API."""
+    if len(text) < TEXT_LOWER_LIMIT:
+        return {"error": "Text too short (min 3 characters)"}
+    pieces = _split_text(text)
+    if len(pieces) == 1:
+        return _score_text(text, token, language, explain)
+    with ThreadPoolExecutor(max_workers=SECTION_WORKERS) as executor:
+        results = list(
+            executor.map(
+                lambda piece: _score_text(piece, token, language, explain), pieces
+            )
+        )
+    return _merge_scores(results, pieces)
+
+
+def check_sections(
+    sections: dict[str, str],
+    token: str,
+    language: str = "en",
+    explain: bool = True,
+    max_workers: int = SECTION_WORKERS,
+) -> dict[str, dict]:
+    """Check several texts concurrently, returning results in input order.
+
+    Texts over the API limit are split into chunks that share the same
+    pool, so at most max_workers requests are in flight.
+    """
+    results = {}
+    pieces = {}
+    for name, text in sections.items():
+        if len(text) < TEXT_LOWER_LIMIT:
+            results[name] = {"error": "Text too short (min 3 characters)"}
+        else:
+            pieces[name] = _split_text(text)
+    if not pieces:
+        return {name: results[name] for name in sections}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            name: [
+                executor.submit(_score_text, piece, token, language, explain)
+                for piece in name_pieces
+            ]
+            for name, name_pieces in pieces.items()
+        }
+        for name, name_futures in futures.items():
+            results[name] = _merge_scores(
+                [future.result() for future in name_futures], pieces[name]
+            )
+    return {name: results[name] for name in sections}
+
 
 def is_auth_error(result: dict) -> bool:
     """Check if a result indicates an expired/invalid token."""
@@ -230,6 +624,13 @@ def format_chunk_result(chunk: dict) -> str:
         return f'  HUMAN: "{text_preview}..."'
 
 
+def _echo_chunk_group(title: str, chunks: list[dict], color: str) -> None:
+    """Print a titled group of chunk lines with a single write."""
+    lines = [click.style(title, fg=color)]
+    lines.extend(click.style(format_chunk_result(c), fg=color) for c in chunks)
+    click.echo("\n".join(lines))
+
+
 def display_results(result: dict, label: str = "") -> Optional[dict]:
     """Display AI detection results."""
     if "error" in result:
@@ -270,9 +671,17 @@ def display_results(result: dict, label: str = "") -> Optional[dict]:
     click.echo(f"  Model Version:       {model_ver}")
     click.echo(f"  Chunks Analyzed:     {len(chunks)}")
 
-    ai_chunks = [c for c in chunks if c.get("type") == "AI"]
-    human_chunks = [c for c in chunks if c.get("type") == "HUMAN"]
-    paraphrased_chunks = [c for c in chunks if c.get("type") == "HUMAN-PARAPHRASED"]
+    # Partition chunks by type in a single pass
+    ai_chunks, human_chunks, paraphrased_chunks = [], [], []
+    by_type = {
+        "AI": ai_chunks,
+        "HUMAN": human_chunks,
+        "HUMAN-PARAPHRASED": paraphrased_chunks,
+    }
+    for chunk in chunks:
+        bucket = by_type.get(chunk.get("type"))
+        if bucket is not None:
+            bucket.append(chunk)
 
     click.echo(f"  AI Chunks:           {len(ai_chunks)}")
     click.echo(f"  Human Chunks:        {len(human_chunks)}")
@@ -280,22 +689,14 @@ def display_results(result: dict, label: str = "") -> Optional[dict]:
     click.echo(f"{'─' * 60}")
 
     if ai_chunks:
-        click.echo(click.style("\nAI-Detected Sections:", fg="red"))
-        ai_sorted = sorted(
-            ai_chunks, key=lambda c: c.get("aiScore", 0), reverse=True
-        )
-        for chunk in ai_sorted:
-            click.echo(click.style(format_chunk_result(chunk), fg="red"))
+        ai_chunks.sort(key=lambda c: c.get("aiScore", 0), reverse=True)
+        _echo_chunk_group("\nAI-Detected Sections:", ai_chunks, "red")
 
     if paraphrased_chunks:
-        click.echo(click.style("\nParaphrased Sections:", fg="yellow"))
-        for chunk in paraphrased_chunks:
-            click.echo(click.style(format_chunk_result(chunk), fg="yellow"))
+        _echo_chunk_group("\nParaphrased Sections:", paraphrased_chunks, "yellow")
 
     if human_chunks and len(human_chunks) <= 10:
-        click.echo(click.style("\nHuman Sections:", fg="green"))
-        for chunk in human_chunks:
-            click.echo(click.style(format_chunk_result(chunk), fg="green"))
+        _echo_chunk_group("\nHuman Sections:", human_chunks, "green")
     elif human_chunks:
         click.echo(
             click.style(
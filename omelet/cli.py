@@ -2,15 +2,68 @@
 Main CLI module for Omelet
 """
 
+import hashlib
+import zlib
 import click
-import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
-from .markdown_processor import MarkdownProcessor
-from .image_uploader import ImageUploader
-from .gcs_uploader import GCSUploader
-from .gcloud_auth import GCloudAuth
-from .config import Config
-from .image_metadata import strip_image_metadata, scrub_watermark as scrub_image
+from typing import TYPE_CHECKING, Optional
+from .markdown_processor import MarkdownProcessor, wrap_plantuml
+from .config import Config, get_config
+from .hashcache import CACHE_DIR, JsonCache, file_stamp, replace_file
+
+# requests (and the uploaders built on it) are imported where they are used,
+# so `omelet --help` and commands that never touch the network start faster
+if TYPE_CHECKING:
+    import requests
+
+
+UPLOAD_WORKERS = 8
+PLANTUML_WORKERS = 8
+PLANTUML_CHUNK_SIZE = 64 * 1024
+# With plantuml_deflate enabled, diagram sources at least this large are sent
+# deflate-compressed; below it the saving is smaller than the header overhead
+PLANTUML_DEFLATE_MIN = 1024
+PLANTUML_HEADERS = {"Content-Type": "text/plain; charset=utf-8"}
+# Servers found not to accept deflated bodies, sent plain bodies from then on
+_PLANTUML_NO_DEFLATE = set()
+# Rendered diagrams shared across runs and documents, keyed by source hash
+PLANTUML_CACHE_DIR = CACHE_DIR / "puml"
+# Public URLs of uploaded images, reused while the file is unchanged
+UPLOAD_CACHE = JsonCache(CACHE_DIR / "uploads.json")
+
+
+@lru_cache(maxsize=1)
+def _plantuml_session() -> "requests.Session":
+    """
+    Shared keep-alive session for the PlantUML service, so consecutive
+    diagrams reuse one pooled TLS connection instead of a new handshake per
+    request. Rendering is side-effect free, so POSTs are retried on
+    connection/read failures and 5xx responses too.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    session.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=3,
+                connect=3,
+                read=2,
+                backoff_factor=0.5,
+                status_forcelist=(500, 502, 503, 504),
+                allowed_methods=frozenset({"POST"}),
+                raise_on_status=False,
+            ),
+        ),
+    )
+    return session
 
 
 @click.group()
@@ -19,33 +72,254 @@ def cli():
     pass
 
 
-def convert_plantuml_to_image(puml_content: str, output_path: Path) -> bool:
-    """Convert PlantUML content to PNG image via puml.omelet.tech"""
-    content = puml_content.strip()
-    if not content.startswith("@startuml"):
-        content = "@startuml\n" + content
-    if not content.endswith("@enduml"):
-        content = content + "\n@enduml"
+def _post_plantuml(url: str, puml_bytes: bytes, timeout: int) -> "requests.Response":
+    """POST a diagram source, deflate-compressed if enabled and large enough.
+
+    Compression is opt-in (plantuml_deflate), as a server that ignores the
+    request Content-Encoding reads the compressed bytes as diagram text. If
+    the server rejects the encoding (415), or fails to parse the deflated
+    body (400 with a diagram error) but renders the plain one, the plain
+    body is used and that server is not sent compressed bodies again. The
+    response is streamed; callers are responsible for closing it.
+    """
+    session = _plantuml_session()
+    if (
+        get_config().plantuml_deflate
+        and len(puml_bytes) >= PLANTUML_DEFLATE_MIN
+        and url not in _PLANTUML_NO_DEFLATE
+    ):
+        headers = {**PLANTUML_HEADERS, "Content-Encoding": "deflate"}
+        body = zlib.compress(puml_bytes, 6)
+        response = session.post(
+            url, data=body, headers=headers, timeout=timeout, stream=True
+        )
+        unsupported = response.status_code == 415
+        unparsed = (
+            response.status_code == 400
+            and "x-plantuml-diagram-error" in response.headers
+        )
+        if not unsupported and not unparsed:
+            return response
+        response.close()
+        plain = session.post(
+            url, data=puml_bytes, headers=PLANTUML_HEADERS, timeout=timeout, stream=True
+        )
+        if unsupported or plain.ok:
+            _PLANTUML_NO_DEFLATE.add(url)
+        return plain
+    return session.post(
+        url, data=puml_bytes, headers=PLANTUML_HEADERS, timeout=timeout, stream=True
+    )
 
-    url = "https://puml.omelet.tech/png"
-    headers = {"Content-Type": "text/plain; charset=utf-8"}
 
-    response = requests.post(url, data=content.encode("utf-8"), headers=headers, timeout=60)
-    response.raise_for_status()
+def _copy_file(src: Path, dst: Path):
+    """
+    Copy src to dst, replacing dst atomically
 
-    output_path.write_bytes(response.content)
+    Not a hardlink: uploads strip metadata (and may scrub) images in place,
+    which would otherwise rewrite the cached copy too.
+    """
+    # replace_file writes files with other hard links in place, which would
+    # truncate src itself if dst is a link to it left by older versions
+    if dst.exists() and dst.samefile(src):
+        dst.unlink()
+    with src.open("rb") as f:
+        replace_file(dst, iter(lambda: f.read(PLANTUML_CHUNK_SIZE), b""))
+
+
+def convert_plantuml_to_image(
+    puml_bytes: bytes,
+    output_path: Path,
+    output_format: str = "png",
+    timeout: int = 60,
+) -> bool:
+    """
+    Convert a wrapped PlantUML source (see wrap_plantuml) to an image via puml.omelet.tech
+
+    Renders are cached by a hash of the wrapped source, so every command
+    rendering the same diagram shares them.
+    """
+    source_hash = hashlib.blake2b(puml_bytes, digest_size=8).hexdigest()
+    # The format is part of the cache key through the file extension
+    cache_path = PLANTUML_CACHE_DIR / f"{source_hash}.{output_format}"
+    if cache_path.is_file() and cache_path.stat().st_size > 0:
+        _copy_file(cache_path, output_path)
+        return True
+
+    url = f"https://puml.omelet.tech/{output_format}"
+
+    with _post_plantuml(url, puml_bytes, timeout=timeout) as response:
+        response.raise_for_status()
+        # Streamed to disk and swapped in atomically: a truncated image would
+        # later be reused as cached
+        replace_file(output_path, response.iter_content(PLANTUML_CHUNK_SIZE))
+
+    # The shared cache is best effort; the render itself already succeeded
+    try:
+        PLANTUML_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _copy_file(output_path, cache_path)
+    except OSError:
+        pass
     return True
 
 
+def _plantuml_error(e: "requests.exceptions.RequestException") -> str:
+    """Prefer the diagram error reported by the PlantUML server, if any"""
+    if getattr(e, "response", None) is not None:
+        if "x-plantuml-diagram-error" in e.response.headers:
+            return e.response.headers["x-plantuml-diagram-error"]
+    return str(e)
+
+
+def render_plantuml_blocks(blocks: list, directory: Path):
+    """
+    Render PlantUML blocks to PNGs in directory concurrently
+
+    Blocks with the same diagram name and hash share one image and are
+    rendered once. An image already present from an earlier run is reused,
+    since its filename embeds the hash of the diagram source. Yields
+    (blocks, image_filename) for each image that is ready.
+    """
+    blocks_by_file = {}
+    for block in blocks:
+        image_filename = f"{block['diagram_name']}-{block['hash']}.png"
+        blocks_by_file.setdefault(image_filename, []).append(block)
+
+    pending = {}
+    for image_filename, same_blocks in blocks_by_file.items():
+        image_path = directory / image_filename
+        if image_path.is_file() and image_path.stat().st_size > 0:
+            click.echo(f"✓ Cached: {image_filename}")
+            yield same_blocks, image_filename
+        else:
+            pending[image_filename] = image_path
+
+    # Nothing left to render (e.g. rebuilding an unchanged file)
+    if not pending:
+        return
+
+    import requests
+
+    executor = ThreadPoolExecutor(max_workers=min(PLANTUML_WORKERS, len(pending)))
+    futures = {}
+    try:
+        for image_filename, image_path in pending.items():
+            same_blocks = blocks_by_file[image_filename]
+            click.echo(f"Converting PlantUML: {same_blocks[0]['diagram_name']}...")
+            block = same_blocks[0]
+            future = executor.submit(convert_plantuml_to_image, block["source"], image_path)
+            futures[future] = image_filename
+
+        for future in as_completed(futures):
+            image_filename = futures[future]
+            same_blocks = blocks_by_file[image_filename]
+            try:
+                future.result()
+            except requests.exceptions.RequestException as e:
+                click.echo(f"✗ Failed to convert {same_blocks[0]['diagram_name']}: {_plantuml_error(e)}", err=True)
+                continue
+            click.echo(f"✓ Generated: {image_filename}")
+            yield same_blocks, image_filename
+    finally:
+        # If the caller stops early (interrupt or error), renders not yet
+        # started are dropped rather than waited for
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def _upload_target(uploader) -> str:
+    """Identify where an uploader puts images (GCS bucket or API backend)"""
+    if hasattr(uploader, "bucket_name"):
+        return f"gs://{uploader.bucket_name}"
+    return uploader.config.backend_url or ""
+
+
+def _prepare_and_upload(uploader, image_path: Path, folder: str, scrub: bool = False) -> str:
+    """
+    Scrub/strip one image in place and upload it, return its public URL
+
+    An image already uploaded to the same target and folder is skipped
+    while its size and mtime match what was recorded after that upload,
+    unless scrubbing is asked for and that upload was not scrubbed.
+    """
+    from .image_metadata import strip_image_metadata, scrub_watermark as scrub_image
+
+    key = "|".join((_upload_target(uploader), folder, str(image_path)))
+    cached = UPLOAD_CACHE.get(key, file_stamp(image_path))
+    if cached and (cached["scrubbed"] or not scrub):
+        click.echo(f"✓ Already uploaded: {image_path.name}")
+        return cached["url"]
+
+    if scrub and scrub_image(image_path):
+        click.echo(f"✓ Scrubbed watermark: {image_path.name}")
+    if strip_image_metadata(image_path):
+        click.echo(f"✓ Stripped metadata: {image_path.name}")
+    public_url = uploader.upload_image(image_path, folder)
+
+    # Stamped after scrubbing/stripping, which rewrite the file
+    UPLOAD_CACHE.set(key, {"url": public_url, "scrubbed": scrub}, file_stamp(image_path))
+    return public_url
+
+
+def _start_upload(executor, started: dict, uploader, image_path: Path, folder: str, scrub: bool = False):
+    """Submit an upload of image_path unless one was already started"""
+    if image_path not in started:
+        started[image_path] = executor.submit(_prepare_and_upload, uploader, image_path, folder, scrub)
+
+
+def upload_local_images(uploader, images: list, folder: str, executor, started: dict, scrub: bool = False):
+    """
+    Upload local images concurrently on executor, each distinct file only once
+
+    started maps image paths to uploads already begun with _start_upload
+    (e.g. diagrams uploaded as soon as they rendered); those are picked up
+    instead of being submitted again. Yields (image_path, original_refs,
+    future) as uploads complete, where original_refs are all markdown
+    references pointing at that file.
+    """
+    refs_by_path = {}
+    for image_info in images:
+        refs_by_path.setdefault(image_info["path"], []).append(image_info["original"])
+
+    for path in refs_by_path:
+        _start_upload(executor, started, uploader, path, folder, scrub)
+    futures = {started[path]: path for path in refs_by_path}
+    for future in as_completed(futures):
+        path = futures[future]
+        yield path, refs_by_path[path], future
+
+
+def _stop_uploads(executor, started: dict, images: list, url_mappings: dict):
+    """
+    Shut executor down without running queued uploads, keeping finished ones
+
+    Called when processing ends, normally or not: after an interrupt or an
+    error, uploads still queued are cancelled instead of being waited for
+    (on Python 3.8 shutdown() has no cancel_futures). URLs of the uploads
+    that did complete are added to url_mappings for their references among
+    images, so they are written back even if nothing collected them yet.
+    """
+    for future in started.values():
+        future.cancel()
+    executor.shutdown(wait=False)
+
+    for image_info in images:
+        future = started.get(image_info["path"])
+        if future is None or not future.done() or future.cancelled() or future.exception():
+            continue
+        url_mappings.setdefault(image_info["original"], future.result())
+
+
 @cli.command()
-@click.argument("file", type=click.Path(exists=True))
+@click.argument("file", type=click.Path(exists=True, dir_okay=False, path_type=Path))
 @click.option("--folder", "-f", help="Folder name for organizing uploads (defaults to parent folder)")
 @click.option("--no-plantuml", is_flag=True, help="Skip PlantUML processing")
 def buildmarkdown(file, folder, no_plantuml):
     """Process a markdown file and upload local images"""
-    file_path = Path(file)
+    file_path = file
 
-    if not file_path.suffix.lower() == ".md":
+    if not file_path.suffix.casefold() == ".md":
         click.echo(f"Error: {file} is not a markdown file", err=True)
         raise click.Abort()
 
@@ -56,12 +330,15 @@ def buildmarkdown(file, folder, no_plantuml):
     click.echo(f"Processing markdown file: {file}")
 
     # Initialize components
-    config = Config()
+    config = get_config()
     processor = MarkdownProcessor()
 
     # Choose uploader based on configuration
     if config.use_gcs:
         # Use Google Cloud Storage
+        from .gcloud_auth import GCloudAuth
+        from .gcs_uploader import GCSUploader
+
         auth = GCloudAuth()
         if not auth.is_authenticated():
             click.echo("Error: Not authenticated with Google Cloud.", err=True)
@@ -71,161 +348,188 @@ def buildmarkdown(file, folder, no_plantuml):
         click.echo(f"Using Google Cloud Storage (bucket: {config.gcs_bucket})")
     else:
         # Use API backend
+        from .image_uploader import ImageUploader
+
         uploader = ImageUploader(config)
         click.echo(f"Using API backend: {config.backend_url}")
 
     try:
         # Read the markdown file
         content = file_path.read_text(encoding="utf-8")
+        original_content = content
+        url_mappings = {}
+
+        # Diagrams and uploads only update content in memory; it is saved
+        # with a single write at the end. If interrupted, whatever finished
+        # is still written back so a rerun does not redo it
+        executor = ThreadPoolExecutor(max_workers=UPLOAD_WORKERS)
+        started = {}
+        try:
+            # Images already in the document start uploading right away,
+            # and each diagram as soon as it is rendered, so uploads run
+            # alongside PlantUML rendering
+            puml_blocks, images = processor.find_assets(content, file_path)
+            for image_info in images:
+                _start_upload(executor, started, uploader, image_info["path"], folder)
 
-        # Process PlantUML blocks first
-        if not no_plantuml:
-            puml_blocks = processor.find_plantuml_blocks(content)
-            if puml_blocks:
-                click.echo(f"Found {len(puml_blocks)} PlantUML block(s) to convert")
+            # Process PlantUML blocks first
+            if not no_plantuml:
+                if puml_blocks:
+                    click.echo(f"Found {len(puml_blocks)} PlantUML block(s) to convert")
 
-                for block in puml_blocks:
+                    # Resolved once, to match the paths find_local_images returns
+                    directory = file_path.parent.resolve()
+                    rendered = []
                     try:
-                        image_filename = f"{block['diagram_name']}-{block['hash']}.png"
-                        image_path = file_path.parent / image_filename
-
-                        click.echo(f"Converting PlantUML: {block['diagram_name']}...")
-                        convert_plantuml_to_image(block['content'], image_path)
-                        click.echo(f"✓ Generated: {image_filename}")
-
-                        content = processor.replace_plantuml_with_image(content, block, image_filename)
-                        file_path.write_text(content, encoding="utf-8")
-
-                    except requests.exceptions.RequestException as e:
-                        error_msg = str(e)
-                        if hasattr(e, "response") and e.response is not None:
-                            if "x-plantuml-diagram-error" in e.response.headers:
-                                error_msg = e.response.headers["x-plantuml-diagram-error"]
-                        click.echo(f"✗ Failed to convert {block['diagram_name']}: {error_msg}", err=True)
-            else:
-                click.echo("No PlantUML blocks found")
-
-        # Re-read content after PlantUML processing
-        content = file_path.read_text(encoding="utf-8")
-
-        # Find all local images
-        images = processor.find_local_images(content, file_path)
-
-        if not images:
-            click.echo("No local images found in the markdown file")
-            return
-
-        click.echo(f"Found {len(images)} local image(s) to upload")
-
-        # Upload images and replace URLs one by one
-        total_updated = 0
-
-        with click.progressbar(images, label="Uploading images") as bar:
-            for image_info in bar:
-                try:
-                    if strip_image_metadata(image_info["path"]):
-                        click.echo(f"\n✓ Stripped metadata: {image_info['path'].name}")
-                    public_url = uploader.upload_image(image_info["path"], folder)
-                    click.echo(f"\n✓ Uploaded: {image_info['path'].name} -> {public_url}")
+                        for blocks, image_filename in render_plantuml_blocks(puml_blocks, directory):
+                            rendered.extend((block, image_filename) for block in blocks)
+                            _start_upload(executor, started, uploader, directory / image_filename, folder)
+                    finally:
+                        # Spliced in with one pass, also when interrupted
+                        content = processor.replace_plantuml_blocks(content, rendered)
+                else:
+                    click.echo("No PlantUML blocks found")
 
-                    # Replace URL in content immediately after successful upload
-                    url_mapping = {image_info["original"]: public_url}
-                    content = processor.replace_urls(content, url_mapping)
+            # Find all local images, now including rendered diagrams
+            if puml_blocks and not no_plantuml:
+                images = processor.find_local_images(content, file_path)
 
-                    # Save the updated content to file
-                    file_path.write_text(content, encoding="utf-8")
-                    total_updated += 1
-                    click.echo(f"✓ Updated markdown file with new URL")
+            if not images:
+                click.echo("No local images found in the markdown file")
+                return
 
-                except Exception as e:
-                    click.echo(f"\n✗ Failed to upload {image_info['path'].name}: {str(e)}", err=True)
+            click.echo(f"Found {len(images)} local image(s) to upload")
 
-        if total_updated > 0:
-            click.echo(f"\n✓ Successfully updated {total_updated} image URL(s) in {file}")
+            with click.progressbar(length=len({img["path"] for img in images}), label="Uploading images") as bar:
+                for image_path, originals, future in upload_local_images(uploader, images, folder, executor, started):
+                    try:
+                        public_url = future.result()
+                        click.echo(f"\n✓ Uploaded: {image_path.name} -> {public_url}")
+                        for original in originals:
+                            url_mappings[original] = public_url
+
+                    except Exception as e:
+                        click.echo(f"\n✗ Failed to upload {image_path.name}: {str(e)}", err=True)
+                    bar.update(1)
+        finally:
+            _stop_uploads(executor, started, processor.find_local_images(content, file_path), url_mappings)
+            if url_mappings:
+                content = processor.replace_urls(content, url_mappings)
+            if content != original_content:
+                replace_file(file_path, content)
+
+        if url_mappings:
+            click.echo(f"\n✓ Successfully updated {len(url_mappings)} image URL(s) in {file}")
 
     except Exception as e:
         click.echo(f"Error: {str(e)}", err=True)
         raise click.Abort()
 
 
-def process_markdown_images(file_path: Path, config: Config, processor: MarkdownProcessor, skip_plantuml: bool = False, scrub: bool = False):
-    """Process PlantUML blocks and upload local images, return updated content."""
-    content = file_path.read_text(encoding="utf-8")
+def process_markdown_images(
+    file_path: Path,
+    config: Config,
+    processor: MarkdownProcessor,
+    skip_plantuml: bool = False,
+    scrub: bool = False,
+    content: Optional[str] = None,
+) -> str:
+    """Process PlantUML blocks and upload local images, return updated content.
+
+    Pass content when the caller already holds the file's current text to
+    skip reading it again.
+    """
+    if content is None:
+        content = file_path.read_text(encoding="utf-8")
+    # Resolved once, to match the paths find_local_images returns
+    directory = file_path.parent.resolve()
     folder = file_path.parent.name
 
+    original_content = content
+    url_mappings = {}
+
+    puml_blocks, images = processor.find_assets(content, file_path)
+    if skip_plantuml:
+        puml_blocks = []
+
+    # The uploader (and its GCS client) is only set up when there is
+    # something to upload: local images, or diagrams that become images
+    if not puml_blocks and not images:
+        return content
+
     # Choose uploader based on configuration
     uploader = None
     if config.use_gcs:
+        from .gcloud_auth import GCloudAuth
+        from .gcs_uploader import GCSUploader
+
         auth = GCloudAuth()
         if auth.is_authenticated():
             uploader = GCSUploader(config.gcs_bucket, auth)
             click.echo(f"Using Google Cloud Storage (bucket: {config.gcs_bucket})")
     else:
+        from .image_uploader import ImageUploader
+
         uploader = ImageUploader(config)
 
-    # Process PlantUML blocks first
-    if not skip_plantuml:
-        puml_blocks = processor.find_plantuml_blocks(content)
+    # As in buildmarkdown: uploads start while diagrams are still rendering,
+    # and content is updated in memory and saved once at the end
+    executor = ThreadPoolExecutor(max_workers=UPLOAD_WORKERS)
+    started = {}
+    try:
+        if uploader:
+            for image_info in images:
+                _start_upload(executor, started, uploader, image_info["path"], folder, scrub)
+
         if puml_blocks:
             click.echo(f"Found {len(puml_blocks)} PlantUML block(s) to convert")
-            for block in puml_blocks:
-                try:
-                    image_filename = f"{block['diagram_name']}-{block['hash']}.png"
-                    image_path = file_path.parent / image_filename
-
-                    click.echo(f"Converting PlantUML: {block['diagram_name']}...")
-                    convert_plantuml_to_image(block['content'], image_path)
-                    click.echo(f"✓ Generated: {image_filename}")
-
-                    content = processor.replace_plantuml_with_image(content, block, image_filename)
-                    file_path.write_text(content, encoding="utf-8")
-                except requests.exceptions.RequestException as e:
-                    error_msg = str(e)
-                    if hasattr(e, "response") and e.response is not None:
-                        if "x-plantuml-diagram-error" in e.response.headers:
-                            error_msg = e.response.headers["x-plantuml-diagram-error"]
-                    click.echo(f"✗ Failed to convert {block['diagram_name']}: {error_msg}", err=True)
-
-    # Re-read content after PlantUML processing
-    content = file_path.read_text(encoding="utf-8")
-
-    # Find and upload local images
-    if uploader:
-        images = processor.find_local_images(content, file_path)
-        if images:
+            rendered = []
+            try:
+                for blocks, image_filename in render_plantuml_blocks(puml_blocks, directory):
+                    rendered.extend((block, image_filename) for block in blocks)
+                    if uploader:
+                        _start_upload(executor, started, uploader, directory / image_filename, folder, scrub)
+            finally:
+                content = processor.replace_plantuml_blocks(content, rendered)
+
+        # Rendered diagrams are now image references too
+        if puml_blocks:
+            images = processor.find_local_images(content, file_path)
+        if uploader and images:
             click.echo(f"Found {len(images)} local image(s) to upload")
-            for image_info in images:
+            for image_path, originals, future in upload_local_images(uploader, images, folder, executor, started, scrub):
                 try:
-                    if scrub and scrub_image(image_info["path"]):
-                        click.echo(f"✓ Scrubbed watermark: {image_info['path'].name}")
-                    if strip_image_metadata(image_info["path"]):
-                        click.echo(f"✓ Stripped metadata: {image_info['path'].name}")
-                    public_url = uploader.upload_image(image_info["path"], folder)
-                    click.echo(f"✓ Uploaded: {image_info['path'].name}")
-                    url_mapping = {image_info["original"]: public_url}
-                    content = processor.replace_urls(content, url_mapping)
-                    file_path.write_text(content, encoding="utf-8")
+                    public_url = future.result()
+                    click.echo(f"✓ Uploaded: {image_path.name}")
+                    for original in originals:
+                        url_mappings[original] = public_url
                 except Exception as e:
-                    click.echo(f"✗ Failed to upload {image_info['path'].name}: {str(e)}", err=True)
+                    click.echo(f"✗ Failed to upload {image_path.name}: {str(e)}", err=True)
+    finally:
+        _stop_uploads(executor, started, processor.find_local_images(content, file_path), url_mappings)
+        if url_mappings:
+            content = processor.replace_urls(content, url_mappings)
+        if content != original_content:
+            replace_file(file_path, content)
 
     return content
 
 
 @cli.command()
-@click.argument("file", type=click.Path(exists=True))
+@click.argument("file", type=click.Path(exists=True, dir_okay=False, path_type=Path))
 @click.option("--no-plantuml", is_flag=True, help="Skip PlantUML processing")
 @click.option("--no-images", is_flag=True, help="Skip image processing")
 @click.option("--featured-image", "-i", type=click.Path(exists=True), help="Featured image path")
 @click.option("--scrub-watermark", is_flag=True, help="Disrupt SynthID/AI watermark via downscale+noise+upscale before upload")
 def publish(file, no_plantuml, no_images, featured_image, scrub_watermark):
     """Build and publish a markdown file to Ghost CMS"""
-    file_path = Path(file)
+    file_path = file
 
-    if not file_path.suffix.lower() == ".md":
+    if not file_path.suffix.casefold() == ".md":
         click.echo(f"Error: {file} is not a markdown file", err=True)
         raise click.Abort()
 
-    config = Config()
+    config = get_config()
 
     if not config.ghost_api_url or not config.ghost_admin_api_key:
         click.echo("Error: Ghost API not configured.", err=True)
@@ -242,32 +546,40 @@ def publish(file, no_plantuml, no_images, featured_image, scrub_watermark):
             original = f.read()
         normalized = processor.normalize_punctuation(original)
         if normalized != original:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(normalized)
+            replace_file(file_path, normalized)
             click.echo("✓ Normalized punctuation (em-dash → hyphen, removed body `---` dividers)")
 
         # Step 1: Process images (PlantUML + upload)
+        content = normalized
         if not no_images:
-            process_markdown_images(file_path, config, processor, skip_plantuml=no_plantuml, scrub=scrub_watermark)
+            content = process_markdown_images(
+                file_path, config, processor, skip_plantuml=no_plantuml, scrub=scrub_watermark, content=content
+            )
 
         # Step 2: Publish to Ghost
         from .ghost_client import GhostClient
-        click.echo("Publishing to Ghost CMS...")
         ghost = GhostClient(config.ghost_api_url, config.ghost_admin_api_key)
-        post = ghost.publish_markdown(str(file_path))
-
-        click.echo(f"✓ Created post: {post['title']}")
-        click.echo(f"  ID: {post['id']}")
-        click.echo(f"  Slug: {post['slug']}")
 
-        # Step 3: Set featured image if provided
+        # The featured image is uploaded first so the post is created with
+        # it, rather than fetched and updated again afterwards
+        feature_image_url = None
         if featured_image:
+            from .image_metadata import strip_image_metadata, scrub_watermark as scrub_image
+
             if scrub_watermark and scrub_image(featured_image):
                 click.echo(f"✓ Scrubbed watermark: {Path(featured_image).name}")
             if strip_image_metadata(featured_image):
                 click.echo(f"✓ Stripped metadata: {Path(featured_image).name}")
             click.echo(f"Uploading featured image: {featured_image}")
-            ghost.set_featured_image(post['id'], featured_image)
+            feature_image_url = ghost.upload_image(featured_image)
+
+        click.echo("Publishing to Ghost CMS...")
+        post = ghost.publish_markdown(str(file_path), content=content, feature_image=feature_image_url)
+
+        click.echo(f"✓ Created post: {post['title']}")
+        click.echo(f"  ID: {post['id']}")
+        click.echo(f"  Slug: {post['slug']}")
+        if feature_image_url:
             click.echo("✓ Featured image set")
 
         edit_url = f"{config.ghost_api_url}/ghost/#/editor/post/{post['id']}"
@@ -279,9 +591,9 @@ def publish(file, no_plantuml, no_images, featured_image, scrub_watermark):
 
 
 @cli.command()
-@click.option("--file", "-f", type=click.Path(exists=True), help="Path to the .puml file")
+@click.option("--file", "-f", type=click.Path(exists=True, dir_okay=False, path_type=Path), help="Path to the .puml file")
 @click.option("--string", "-s", help="PlantUML string content")
-@click.option("--output", "-o", required=True, type=click.Path(), help="Output image path (e.g., diagram.png)")
+@click.option("--output", "-o", required=True, type=click.Path(dir_okay=False, path_type=Path), help="Output image path (e.g., diagram.png)")
 @click.option(
     "--format",
     "output_format",
@@ -302,31 +614,19 @@ def puml(file, string, output, output_format):
     # Get content from file or string
     if file:
         try:
-            content = Path(file).read_text(encoding="utf-8")
+            content = file.read_text(encoding="utf-8")
         except Exception as e:
             click.echo(f"Error reading file: {e}", err=True)
             raise click.Abort()
     else:
         content = string
 
-    # Ensure content has @startuml and @enduml tags
-    content = content.strip()
-    if not content.startswith("@startuml"):
-        content = "@startuml\n" + content
-    if not content.endswith("@enduml"):
-        content = content + "\n@enduml"
-
-    # Send to PlantUML service
-    url = f"https://puml.omelet.tech/{output_format}"
-    headers = {"Content-Type": "text/plain; charset=utf-8"}
+    import requests
 
+    # Send to PlantUML service (or reuse an earlier render of the same source)
     try:
         click.echo(f"Converting PlantUML to {output_format}...")
-        response = requests.post(url, data=content.encode("utf-8"), headers=headers, timeout=30)
-        response.raise_for_status()
-
-        output_path = Path(output)
-        output_path.write_bytes(response.content)
+        convert_plantuml_to_image(wrap_plantuml(content), output, output_format, timeout=30)
         click.echo(f"✓ Successfully saved image to {output}")
 
     except requests.exceptions.RequestException as e:
@@ -338,7 +638,7 @@ def puml(file, string, output, output_format):
 
 
 @cli.command()
-@click.argument("file", required=False, type=click.Path(exists=True))
+@click.argument("file", required=False, type=click.Path(exists=True, dir_okay=False, path_type=Path))
 @click.option("--token", "-t", help="QuillBot Firebase JWT token (useridtoken)")
 @click.option("--text", help="Direct text to check instead of a file")
 @click.option("--section", help="Check only a specific section (for LaTeX files)")
@@ -363,12 +663,12 @@ def aicheck(file, token, text, section, language, no_explain, raw, all_sections)
       - quillbot_token in ~/.omelet.json
     """
     import json as json_mod
-    import time
     from .ai_check import (
-        strip_latex,
-        extract_sections,
+        load_sections,
+        load_stripped,
         detect_language,
         check_ai_score,
+        check_sections,
         display_results,
         is_auth_error,
         TEXT_LOWER_LIMIT,
@@ -379,7 +679,7 @@ def aicheck(file, token, text, section, language, no_explain, raw, all_sections)
         raise click.Abort()
 
     # Resolve token: flag -> config -> env -> prompt
-    config = Config()
+    config = get_config()
     if not token:
         token = config.quillbot_token
     if not token:
@@ -401,12 +701,11 @@ def aicheck(file, token, text, section, language, no_explain, raw, all_sections)
         check_text = text
         label = "Direct Text"
     else:
-        file_path = Path(file)
-        content = file_path.read_text(encoding="utf-8")
-        is_latex = file_path.suffix.lower() in (".tex", ".latex")
+        file_path = file
+        is_latex = file_path.suffix.casefold() in (".tex", ".latex")
 
         if is_latex and all_sections:
-            sections = extract_sections(content)
+            sections = load_sections(file_path)
             if not sections:
                 click.echo("No sections found in file", err=True)
                 raise click.Abort()
@@ -419,24 +718,35 @@ def aicheck(file, token, text, section, language, no_explain, raw, all_sections)
                 lang_code, lang_name = detect_language(first_text, token)
                 click.echo(f"Detected language: {lang_name} ({lang_code})")
 
+            to_check = {}
             for sec_name, sec_text in sections.items():
                 if len(sec_text) < TEXT_LOWER_LIMIT:
                     click.echo(f"\nSkipping '{sec_name}' (too short)")
                     continue
-                click.echo(f"\nChecking section: {sec_name} ({len(sec_text)} chars)...")
-                result = check_ai_score(sec_text, token, lang_code, explain)
-                if is_auth_error(result):
-                    token = refresh_token()
-                    result = check_ai_score(sec_text, token, lang_code, explain)
+                to_check[sec_name] = sec_text
+
+            # Sections are independent requests, so check them concurrently
+            click.echo(f"\nChecking {len(to_check)} section(s)...")
+            results = check_sections(to_check, token, lang_code, explain)
+            expired = {
+                name: to_check[name]
+                for name, result in results.items()
+                if is_auth_error(result)
+            }
+            if expired:
+                token = refresh_token()
+                results.update(check_sections(expired, token, lang_code, explain))
+
+            for sec_name, result in results.items():
+                click.echo(f"\nSection: {sec_name} ({len(to_check[sec_name])} chars)")
                 if raw:
                     click.echo(json_mod.dumps(result, indent=2))
                 else:
                     display_results(result, label=sec_name.title())
-                time.sleep(1)
             return
 
         if is_latex and section:
-            sections = extract_sections(content)
+            sections = load_sections(file_path)
             match = section.lower()
             found = None
             for name, body in sections.items():
@@ -452,11 +762,11 @@ def aicheck(file, token, text, section, language, no_explain, raw, all_sections)
             check_text = found[1]
             label = found[0].title()
         elif is_latex:
-            check_text = strip_latex(content)
+            check_text = load_stripped(file_path)
             label = file_path.name
         else:
             # Plain text / markdown / any other file
-            check_text = content
+            check_text = file_path.read_text(encoding="utf-8")
             label = file_path.name
 
     # Detect language
@@ -551,7 +861,7 @@ def generate_image(prompt, output, blog, style, output_opt, provider, model, siz
     """
     output_path = output_opt or output
 
-    config = Config()
+    config = get_config()
     resolved_model = model or PROVIDER_DEFAULT_MODEL[provider]
 
     if provider == "openai":
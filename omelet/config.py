@@ -2,10 +2,24 @@
 Configuration module for Omelet
 """
 import os
+from functools import lru_cache
 from pathlib import Path
 import json
 from typing import Optional
 
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+
+def _read_json(path: Path) -> dict:
+    """Parse a JSON file, with orjson when installed"""
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with open(path, 'r') as f:
+        return json.load(f)
+
 
 class Config:
     """Configuration manager for Omelet"""
@@ -23,6 +37,12 @@ class Config:
         self.gcs_bucket = self.get('gcs_bucket', os.environ.get('OMELET_GCS_BUCKET'))
         self.use_gcs = self.get('use_gcs', os.environ.get('OMELET_USE_GCS', 'false').lower() == 'true')
         
+        # Send large PlantUML sources deflate-compressed (the server must
+        # accept Content-Encoding: deflate on requests)
+        self.plantuml_deflate = self.get(
+            'plantuml_deflate', os.environ.get('OMELET_PLANTUML_DEFLATE', 'false').lower() == 'true'
+        )
+        
         # Public webhook URL for publishing markdown
         self.public_webhook_url = self.get('public_webhook_url', os.environ.get('OMELET_PUBLIC_WEBHOOK_URL'))
 
@@ -59,15 +79,12 @@ class Config:
     
     def _load_config(self) -> dict:
         """Load configuration from file"""
-        if self.config_file.exists():
-            try:
-                with open(self.config_file, 'r') as f:
-                    return json.load(f)
-            except Exception:
-                pass
-        
-        # Return empty config (will use defaults)
-        return {}
+        # A missing file is handled by open() rather than a separate exists()
+        try:
+            return _read_json(self.config_file)
+        except Exception:
+            # Return empty config (will use defaults)
+            return {}
     
     def get(self, key: str, default=None):
         """Get a configuration value"""
@@ -79,8 +96,7 @@ class Config:
         data = {}
         if config_path.exists():
             try:
-                with open(config_path, 'r') as f:
-                    data = json.load(f)
+                data = _read_json(config_path)
             except Exception:
                 pass
         data[key] = value
@@ -88,3 +104,8 @@ class Config:
             json.dump(data, f, indent=2)
         self.config[key] = value
     
+
+@lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Return the shared Config, reading the config file once per process"""
+    return Config()
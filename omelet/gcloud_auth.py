@@ -1,12 +1,19 @@
 """
 Google Cloud authentication module for Omelet
 """
+from functools import lru_cache
 from typing import Optional, Tuple
 from google.auth import default
 from google.auth.credentials import Credentials
 import click
 
 
+@lru_cache(maxsize=1)
+def _default_credentials() -> Tuple[Credentials, Optional[str]]:
+    """Discover application default credentials once per process"""
+    return default()
+
+
 class GCloudAuth:
     """Handle Google Cloud authentication using gcloud CLI credentials"""
     
@@ -17,7 +24,7 @@ class GCloudAuth:
     def is_authenticated(self) -> bool:
         """Check if user is authenticated via gcloud CLI"""
         try:
-            self.credentials, self.project_id = default()
+            self.credentials, self.project_id = _default_credentials()
             return self.credentials is not None
         except Exception:
             return False
@@ -31,7 +38,7 @@ class GCloudAuth:
         """
         try:
             if not self.credentials:
-                self.credentials, self.project_id = default()
+                self.credentials, self.project_id = _default_credentials()
             return self.credentials, self.project_id
         except Exception as e:
             click.echo(f"Failed to get gcloud credentials: {str(e)}", err=True)
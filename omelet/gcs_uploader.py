@@ -1,9 +1,57 @@
 """
 Google Cloud Storage uploader module
 """
+import base64
+import hashlib
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
+from google.api_core.exceptions import GoogleAPICallError
 from google.cloud import storage
 from .gcloud_auth import GCloudAuth
+from .hashcache import CACHE_DIR, JsonCache, file_stamp
+from .image_uploader import get_mime_type
+
+
+# Below this size a file is simply uploaded: checking for an existing copy
+# costs a round trip of its own, about as much as the upload itself
+EXISTING_CHECK_MIN_SIZE = 256 * 1024
+# Files up to this size are read once and uploaded from memory; it matches
+# the client's cutoff for single-request multipart uploads
+IN_MEMORY_MAX_SIZE = 8 * 1024 * 1024
+# MD5 digests of local files, reused while size and mtime are unchanged
+MD5_CACHE = JsonCache(CACHE_DIR / "md5.json")
+
+
+@lru_cache(maxsize=4)
+def _get_client(credentials, project_id: Optional[str]) -> storage.Client:
+    """Share one storage client (and its connection pool) per credentials"""
+    return storage.Client(credentials=credentials, project=project_id)
+
+
+def file_md5(path: Path, data: Optional[bytes] = None) -> bytes:
+    """
+    MD5 digest of a file, cached by path, size and mtime
+    
+    data, when given, is the file's content already in memory and is
+    hashed instead of reading the file again.
+    """
+    stamp = file_stamp(path)
+    key = str(path.resolve())
+    cached = MD5_CACHE.get(key, stamp)
+    if cached:
+        return bytes.fromhex(cached)
+    
+    if data is not None:
+        md5 = hashlib.md5(data)
+    else:
+        md5 = hashlib.md5()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                md5.update(chunk)
+    
+    MD5_CACHE.set(key, md5.hexdigest(), stamp)
+    return md5.digest()
 
 
 class GCSUploader:
@@ -21,6 +69,7 @@ class GCSUploader:
         self.auth = auth
         self.client = None
         self.bucket = None
+        self.predefined_acl = None
         self._initialize_client()
     
     def _initialize_client(self):
@@ -29,11 +78,25 @@ class GCSUploader:
         if not credentials:
             raise Exception("Failed to get Google Cloud credentials")
         
-        self.client = storage.Client(
-            credentials=credentials,
-            project=project_id
-        )
+        self.client = _get_client(credentials, project_id)
         self.bucket = self.client.bucket(self.bucket_name)
+        self.predefined_acl = self._get_object_acl()
+    
+    def _get_object_acl(self) -> Optional[str]:
+        """
+        Get the ACL to apply to uploaded objects, checked once per bucket
+        
+        Buckets with uniform bucket-level access reject object ACLs; their
+        objects are made public through bucket IAM instead, so no ACL is set.
+        """
+        try:
+            self.bucket.reload()
+        except Exception:
+            # No permission to read bucket metadata: assume fine-grained ACLs
+            return 'publicRead'
+        if self.bucket.iam_configuration.uniform_bucket_level_access_enabled:
+            return None
+        return 'publicRead'
     
     def upload_image(self, image_path: Path, folder: str) -> str:
         """
@@ -58,29 +121,47 @@ class GCSUploader:
         # Create a blob
         blob = self.bucket.blob(blob_name)
         
-        # Set content type based on file extension
-        content_type = self._get_mime_type(image_path)
+        public_url = f"https://storage.googleapis.com/{self.bucket_name}/{blob_name}"
         
-        # Upload the file
-        with open(image_path, 'rb') as f:
-            blob.upload_from_file(f, content_type=content_type)
+        # Typical images are read once; the same bytes serve the duplicate
+        # check and the upload
+        size = image_path.stat().st_size
+        data = image_path.read_bytes() if size <= IN_MEMORY_MAX_SIZE else None
         
-        # Make the blob publicly accessible
-        blob.make_public()
+        # Skip the upload if the exact same file is already there (e.g.
+        # uploaded from another machine or for an earlier post), but still
+        # apply the ACL, as that copy may not have been made public
+        if size >= EXISTING_CHECK_MIN_SIZE and self._is_uploaded(blob, image_path, data):
+            if self.predefined_acl:
+                blob.acl.save_predefined(self.predefined_acl)
+            return public_url
+        
+        # Set content type based on file extension
+        content_type = get_mime_type(image_path)
+        
+        # Upload the file and make it publicly accessible in one request:
+        # with a known size, images up to 8 MB go out as a single multipart
+        # upload (a bare stream forces a resumable session), and the ACL is
+        # applied by the upload instead of a follow-up make_public() call
+        if data is not None:
+            blob.upload_from_string(data, content_type=content_type, predefined_acl=self.predefined_acl)
+        else:
+            blob.upload_from_filename(str(image_path), content_type=content_type, predefined_acl=self.predefined_acl)
         
         # Return the public URL
-        return f"https://storage.googleapis.com/{self.bucket_name}/{blob_name}"
+        return public_url
     
-    def _get_mime_type(self, file_path: Path) -> str:
-        """Get MIME type for an image file"""
-        mime_types = {
-            '.png': 'image/png',
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg',
-            '.gif': 'image/gif',
-            '.svg': 'image/svg+xml',
-            '.webp': 'image/webp',
-            '.bmp': 'image/bmp',
-            '.ico': 'image/x-icon'
-        }
-        return mime_types.get(file_path.suffix.lower(), 'application/octet-stream')
\ No newline at end of file
+    def _is_uploaded(self, blob, image_path: Path, data: Optional[bytes] = None) -> bool:
+        """Check whether blob already holds this file (or data), by comparing MD5 hashes"""
+        try:
+            blob.reload()
+        except GoogleAPICallError:
+            # Missing, or not readable (e.g. an account that may create
+            # objects but not get them): upload it as if it were new
+            return False
+        
+        # Composite objects have no MD5
+        if not blob.md5_hash:
+            return False
+        
+        return base64.b64decode(blob.md5_hash) == file_md5(image_path, data)
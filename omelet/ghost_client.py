@@ -2,8 +2,11 @@
 Ghost CMS client for publishing blog posts
 """
 import json
+import os
 import re
+import time
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 
@@ -12,13 +15,35 @@ import markdown
 import requests
 from markdown.extensions.tables import TableExtension
 from markdown.extensions.fenced_code import FencedCodeExtension
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .image_uploader import get_mime_type, multipart_kwargs
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+FRONTMATTER_RE = re.compile(r'^---\s*\n(.*?)\n---\s*\n', re.DOTALL)
+
+
+def _encode_json(payload: dict):
+    """Serialize a request body, with orjson when installed.
+
+    json.dumps keeps the default ensure_ascii, so the str body is safe to
+    send as-is.
+    """
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload)
 
 
 def parse_frontmatter(content: str) -> tuple[dict, str]:
     """Parse YAML frontmatter from markdown."""
     frontmatter = {}
 
-    match = re.match(r'^---\s*\n(.*?)\n---\s*\n', content, re.DOTALL)
+    match = FRONTMATTER_RE.match(content)
     if match:
         fm_text = match.group(1)
         body = content[match.end():]
@@ -73,6 +98,19 @@ def parse_frontmatter(content: str) -> tuple[dict, str]:
     return {}, content
 
 
+@lru_cache(maxsize=1)
+def _markdown_renderer() -> markdown.Markdown:
+    """Build the Markdown converter (and its extensions) once, reset per use"""
+    return markdown.Markdown(
+        extensions=[
+            TableExtension(),
+            FencedCodeExtension(),
+            'sane_lists',
+            'attr_list',
+        ]
+    )
+
+
 def markdown_to_html(md_content: str) -> str:
     """Convert markdown to HTML for Ghost CMS.
 
@@ -87,16 +125,7 @@ def markdown_to_html(md_content: str) -> str:
     single newline, which both bloats Ghost output and can confuse its parser
     on multi-line blockquotes and list items.
     """
-    html = markdown.markdown(
-        md_content,
-        extensions=[
-            TableExtension(),
-            FencedCodeExtension(),
-            'sane_lists',
-            'attr_list',
-        ]
-    )
-    return html
+    return _markdown_renderer().reset().convert(md_content)
 
 
 class GhostClient:
@@ -105,32 +134,67 @@ class GhostClient:
     def __init__(self, api_url: str, admin_api_key: str):
         self.api_url = api_url.rstrip('/')
         self.admin_api_key = admin_api_key
-        self.token = self._create_jwt_token()
-        self.headers = {
+        self._token = None
+        self._token_exp = 0
+
+        # One keep-alive session for all Admin API calls, so a publish
+        # (create, upload featured image, fetch, update) reuses a single TLS
+        # connection. Gateway errors are retried for idempotent methods only;
+        # POSTs that create posts or images are never repeated.
+        self.session = requests.Session()
+        self.session.mount(
+            "https://",
+            HTTPAdapter(
+                pool_connections=10,
+                pool_maxsize=20,
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.3,
+                    status_forcelist=(502, 503, 504),
+                    raise_on_status=False,
+                ),
+            ),
+        )
+
+    @property
+    def token(self) -> str:
+        """JWT for the Admin API, reused until 30 seconds before it expires."""
+        if self._token is None or time.time() >= self._token_exp - 30:
+            self._token, self._token_exp = self._create_jwt_token()
+        return self._token
+
+    @property
+    def headers(self) -> dict:
+        """Headers for JSON Admin API requests, with a current token."""
+        return {
             "Authorization": f"Ghost {self.token}",
             "Content-Type": "application/json"
         }
 
-    def _create_jwt_token(self) -> str:
-        """Create JWT token for Ghost Admin API authentication."""
+    def _create_jwt_token(self) -> tuple[str, int]:
+        """Create JWT token for Ghost Admin API authentication.
+
+        Returns the token and its expiry as a Unix timestamp.
+        """
         key_parts = self.admin_api_key.split(':')
         key_id = key_parts[0]
         secret = bytes.fromhex(key_parts[1])
 
         iat = int(datetime.now(timezone.utc).timestamp())
         header = {'alg': 'HS256', 'typ': 'JWT', 'kid': key_id}
+        exp = iat + 5 * 60
         payload = {
             'iat': iat,
-            'exp': iat + 5 * 60,
+            'exp': exp,
             'aud': '/admin/'
         }
 
-        return jwt.encode(payload, secret, algorithm='HS256', headers=header)
+        return jwt.encode(payload, secret, algorithm='HS256', headers=header), exp
 
     def get_post(self, post_id: str) -> dict:
         """Get a post by ID."""
         url = f"{self.api_url}/ghost/api/admin/posts/{post_id}/?formats=html"
-        response = requests.get(url, headers=self.headers)
+        response = self.session.get(url, headers=self.headers)
 
         if response.status_code != 200:
             raise Exception(f"Error getting post: {response.status_code} - {response.text}")
@@ -160,7 +224,7 @@ class GhostClient:
             post_data['posts'][0]['slug'] = slug
 
         url = f"{self.api_url}/ghost/api/admin/posts/?source=html"
-        response = requests.post(url, json=post_data, headers=self.headers)
+        response = self.session.post(url, data=_encode_json(post_data), headers=self.headers)
 
         if response.status_code == 201:
             return response.json()['posts'][0]
@@ -173,7 +237,7 @@ class GhostClient:
         updates["updated_at"] = current["updated_at"]
 
         url = f"{self.api_url}/ghost/api/admin/posts/{post_id}/?source=html"
-        response = requests.put(url, headers=self.headers, json={"posts": [updates]})
+        response = self.session.put(url, headers=self.headers, data=_encode_json({"posts": [updates]}))
 
         if response.status_code != 200:
             raise Exception(f"Error updating post: {response.status_code} - {response.text}")
@@ -186,13 +250,12 @@ class GhostClient:
         headers = {"Authorization": f"Ghost {self.token}"}
 
         with open(image_path, 'rb') as f:
-            ext = Path(image_path).suffix.lower()
-            mime_types = {'.png': 'image/png', '.jpg': 'image/jpeg', '.jpeg': 'image/jpeg', '.gif': 'image/gif', '.webp': 'image/webp'}
-            mime_type = mime_types.get(ext, 'image/png')
-            filename = Path(image_path).name
-            files = {'file': (filename, f, mime_type)}
+            filename = os.path.basename(image_path)
+            files = {'file': (filename, f, get_mime_type(image_path))}
             data = {'purpose': 'image', 'ref': image_path}
-            response = requests.post(url, headers=headers, files=files, data=data)
+            kwargs = multipart_kwargs(files, data)
+            headers.update(kwargs.pop('headers', {}))
+            response = self.session.post(url, headers=headers, **kwargs)
 
         if response.status_code != 201:
             raise Exception(f"Error uploading image: {response.status_code} - {response.text}")
@@ -212,10 +275,18 @@ class GhostClient:
 
         return self.update_post(post_id, updates)
 
-    def publish_markdown(self, markdown_path: str, slug: str = None) -> dict:
-        """Create a new Ghost post from markdown file."""
-        with open(markdown_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+    def publish_markdown(self, markdown_path: str, slug: str = None,
+                         content: Optional[str] = None,
+                         feature_image: Optional[str] = None) -> dict:
+        """Create a new Ghost post from markdown file.
+
+        content, if given, is used instead of re-reading markdown_path.
+        feature_image, if given, is an image URL that takes precedence over
+        the frontmatter's image.
+        """
+        if content is None:
+            with open(markdown_path, 'r', encoding='utf-8') as f:
+                content = f.read()
 
         frontmatter, body = parse_frontmatter(content)
         html_content = markdown_to_html(body)
@@ -241,7 +312,7 @@ class GhostClient:
             excerpt=frontmatter.get('description', ''),
             meta_title=frontmatter.get('title', ''),
             meta_description=frontmatter.get('description', ''),
-            feature_image=frontmatter.get('image'),
+            feature_image=feature_image or frontmatter.get('image'),
             slug=slug
         )
 
@@ -0,0 +1,140 @@
+"""
+Persistent JSON caches kept under ~/.omelet-cache
+"""
+import atexit
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Iterable, Optional, Union
+
+
+CACHE_DIR = Path.home() / ".omelet-cache"
+
+# What replace_file accepts: text, bytes, or bytes chunks (e.g. a response body)
+FileData = Union[str, bytes, Iterable[bytes]]
+
+
+def replace_file(path: Path, data: FileData, encoding: str = "utf-8") -> None:
+    """
+    Write data to a sibling temp file, then atomically move it over path
+
+    data may be a str, bytes, or an iterable of bytes chunks (e.g. a streamed
+    response body), which is written chunk by chunk. A symlinked path has
+    its target replaced; a file with other hard links is written in place,
+    since replacing it would detach it from them.
+    """
+    path = path.resolve()
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        stat = None
+    if stat is not None and stat.st_nlink > 1:
+        _write_data(path, data, encoding)
+        return
+
+    # Unique per writer, as several processes may share a cache file
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        _write_data(tmp_path, data, encoding)
+        if stat is not None:
+            shutil.copymode(path, tmp_path)
+            try:
+                os.chown(tmp_path, stat.st_uid, stat.st_gid)
+            except (AttributeError, OSError):
+                # No chown on Windows, and only root may give files away
+                pass
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _write_data(path: Path, data: FileData, encoding: str) -> None:
+    """Write a str, bytes, or an iterable of bytes chunks to path"""
+    if isinstance(data, str):
+        path.write_text(data, encoding=encoding)
+    elif isinstance(data, bytes):
+        path.write_bytes(data)
+    else:
+        with path.open("wb") as f:
+            for chunk in data:
+                f.write(chunk)
+
+
+def file_stamp(path: Path) -> list:
+    """Stamp that changes whenever a file is modified: [mtime_ns, size]"""
+    stat = path.stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class JsonCache:
+    """
+    A dict persisted as one JSON file, shared by all threads of a process
+
+    The file is read on first use. A run that stores new or changed entries
+    writes it back once, at exit, with those entries merged over whatever is
+    on disk by then; a run that only reads never writes it. Each entry
+    carries a stamp (e.g. a file_stamp) and is only returned for an equal
+    stamp. Past max_entries the least recently stored are dropped.
+    """
+
+    def __init__(self, path: Path, max_entries: int = 10000) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = None
+        self._updated = {}
+
+    def _load(self) -> dict:
+        """Read the file; a missing or corrupt cache reads as empty"""
+        try:
+            entries = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def get(self, key: str, stamp: Optional[list] = None) -> Any:
+        """Return the value stored under key with this stamp, or None"""
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._load()
+            entry = self._entries.get(key)
+        if isinstance(entry, dict) and entry.get("stamp") == stamp:
+            return entry.get("value")
+        return None
+
+    def set(self, key: str, value: Any, stamp: Optional[list] = None) -> None:
+        """Store value under key; it is written out when the process exits"""
+        entry = {"stamp": stamp, "value": value}
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._load()
+            if self._entries.get(key) == entry:
+                return
+            if not self._updated:
+                atexit.register(self.save)
+            for entries in (self._entries, self._updated):
+                entries.pop(key, None)
+                entries[key] = entry
+
+    def save(self) -> None:
+        """Write the entries stored so far to disk; failures are ignored"""
+        with self._lock:
+            if not self._updated:
+                return
+            entries = self._load()
+            for key, entry in self._updated.items():
+                entries.pop(key, None)
+                entries[key] = entry
+            for key in list(entries)[: max(len(entries) - self.max_entries, 0)]:
+                del entries[key]
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                replace_file(self.path, json.dumps(entries))
+            except OSError:
+                return
+            atexit.unregister(self.save)
+            self._entries = entries
+            self._updated = {}
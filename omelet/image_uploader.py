@@ -1,10 +1,54 @@
 """
 Module for uploading images
 """
+import mimetypes
+import os
 from pathlib import Path
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Optional
 
+try:
+    from requests_toolbelt import MultipartEncoder
+except ImportError:  # requests-toolbelt is optional
+    MultipartEncoder = None
+
+
+MIME_TYPES = {
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.gif': 'image/gif',
+    '.svg': 'image/svg+xml',
+    '.webp': 'image/webp',
+    '.bmp': 'image/bmp',
+    '.ico': 'image/x-icon'
+}
+
+
+def get_mime_type(file_path) -> str:
+    """Get MIME type for an image file (str or Path), guessing for unlisted extensions"""
+    name = os.fspath(file_path)
+    return (
+        MIME_TYPES.get(os.path.splitext(name)[1].lower())
+        or mimetypes.guess_type(name)[0]
+        or 'application/octet-stream'
+    )
+
+
+def multipart_kwargs(files: dict, data: dict) -> dict:
+    """
+    Keyword arguments for posting a multipart form with requests
+
+    With requests-toolbelt installed the body is streamed from the open
+    files as it is sent, instead of being built in memory first.
+    """
+    if MultipartEncoder is None:
+        return {'files': files, 'data': data}
+    encoder = MultipartEncoder(fields={**data, **files})
+    return {'data': encoder, 'headers': {'Content-Type': encoder.content_type}}
+
 
 class ImageUploader:
     """Handler for uploading images"""
@@ -12,6 +56,16 @@ class ImageUploader:
     def __init__(self, config):
         self.config = config
         self.session = requests.Session()
+        # Enough pooled connections for every concurrent upload worker.
+        # Failed connects are retried; upload POSTs are not repeated once
+        # sent, since the backend may already have stored the image.
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(total=3, backoff_factor=0.5),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
         # Set up basic auth if configured
         if config.username and config.password:
@@ -37,7 +91,7 @@ class ImageUploader:
         # Prepare the multipart form data
         with open(image_path, 'rb') as f:
             files = {
-                'data': (image_path.name, f, self._get_mime_type(image_path))
+                'data': (image_path.name, f, get_mime_type(image_path))
             }
             data = {
                 'folder': folder
@@ -46,9 +100,8 @@ class ImageUploader:
             # Make the upload request
             response = self.session.post(
                 self.config.backend_url,
-                files=files,
-                data=data,
-                timeout=30
+                timeout=30,
+                **multipart_kwargs(files, data)
             )
 
         # Check for successful upload
@@ -64,17 +117,3 @@ class ImageUploader:
             return public_url
         except (ValueError, KeyError) as e:
             raise Exception(f"Invalid response from server: {str(e)}")
-
-    def _get_mime_type(self, file_path: Path) -> str:
-        """Get MIME type for an image file"""
-        mime_types = {
-            '.png': 'image/png',
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg',
-            '.gif': 'image/gif',
-            '.svg': 'image/svg+xml',
-            '.webp': 'image/webp',
-            '.bmp': 'image/bmp',
-            '.ico': 'image/x-icon'
-        }
-        return mime_types.get(file_path.suffix.lower(), 'application/octet-stream')
@@ -4,14 +4,63 @@ Module for processing markdown files
 from pathlib import Path
 import re
 import hashlib
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
+
+
+IMAGE_EXTENSIONS = frozenset({'.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.bmp', '.ico'})
+URL_PREFIXES = ('http://', 'https://', 'ftp://', '//')
+
+
+def wrap_plantuml(puml_content: str) -> bytes:
+    """Ensure @startuml/@enduml tags and return the UTF-8 request body"""
+    content = puml_content.strip()
+    if not content.startswith("@startuml"):
+        content = "@startuml\n" + content
+    if not content.endswith("@enduml"):
+        content = content + "\n@enduml"
+    return content.encode("utf-8")
 
 
 class MarkdownProcessor:
     """Processor for markdown files"""
     
-    def __init__(self):
-        self.image_pattern = r'!\[([^\]]*)\]\(([^)]+)\)'
+    _IMAGE_RE = re.compile(r'!\[([^\]]*)\]\(([^)]+)\)')
+    _PLANTUML_RE = re.compile(r'```plantuml\s*\n(.*?)```', re.DOTALL)
+    # Either kind of asset, for finding both in a single pass
+    _ASSET_RE = re.compile(_PLANTUML_RE.pattern + '|' + _IMAGE_RE.pattern, re.DOTALL)
+    _STARTUML_RE = re.compile(r'@startuml\s+(\S+)')
+    _DIVIDER_RE = re.compile(r'(?m)^[ \t]*---[ \t]*\n')
+    
+    def find_assets(self, content: str, markdown_path: Path) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Find PlantUML blocks and local images in one pass over the content
+        
+        Images inside a PlantUML block are not reported, since the block
+        is replaced by its diagram.
+        
+        Args:
+            content: The markdown content
+            markdown_path: Path to the markdown file
+            
+        Returns:
+            Tuple of (PlantUML blocks, local images), as returned by
+            find_plantuml_blocks and find_local_images
+        """
+        blocks = []
+        images = []
+        if '```plantuml' not in content and '![' not in content:
+            return blocks, images
+        
+        resolved = {}
+        for match in self._ASSET_RE.finditer(content):
+            if match.group(1) is not None:
+                blocks.append(self._plantuml_block(match, match.group(1)))
+            else:
+                image_info = self._local_image(match, match.group(2), match.group(3), markdown_path, resolved)
+                if image_info:
+                    images.append(image_info)
+        
+        return blocks, images
     
     def find_local_images(self, content: str, markdown_path: Path) -> List[Dict[str, Any]]:
         """
@@ -25,49 +74,74 @@ class MarkdownProcessor:
             List of dictionaries containing image information
         """
         images = []
+
+        # Cheap substring check before running the regex over prose-only files
+        if '![' not in content:
+            return images
         
         # Find all image references
-        matches = re.finditer(self.image_pattern, content)
+        matches = self._IMAGE_RE.finditer(content)
         
+        resolved = {}
         for match in matches:
-            alt_text = match.group(1)
-            image_path = match.group(2)
-            
-            # Check if it's a local image
-            if self._is_local_image(image_path):
-                # Resolve the absolute path
-                if image_path.startswith('./'):
-                    absolute_path = markdown_path.parent / image_path[2:]
-                elif image_path.startswith('../'):
-                    absolute_path = markdown_path.parent / image_path
-                else:
-                    absolute_path = markdown_path.parent / image_path
-                
-                absolute_path = absolute_path.resolve()
-                
-                # Check if file exists
-                if absolute_path.exists() and absolute_path.is_file():
-                    images.append({
-                        'alt_text': alt_text,
-                        'original': image_path,
-                        'path': absolute_path,
-                        'match_start': match.start(),
-                        'match_end': match.end()
-                    })
+            image_info = self._local_image(match, match.group(1), match.group(2), markdown_path, resolved)
+            if image_info:
+                images.append(image_info)
         
         return images
     
+    def _local_image(
+        self,
+        match: re.Match,
+        alt_text: str,
+        image_path: str,
+        markdown_path: Path,
+        resolved: Dict[str, Optional[Path]],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Build the image info for an image reference, None if it is not a local file
+        
+        resolved maps image paths already looked up during this scan to
+        their absolute path (or None), so an image referenced several times
+        is resolved and stat'ed only once.
+        """
+        if image_path not in resolved:
+            resolved[image_path] = self._resolve_local_image(image_path, markdown_path)
+        absolute_path = resolved[image_path]
+        if absolute_path is None:
+            return None
+        
+        return {
+            'alt_text': alt_text,
+            'original': image_path,
+            'path': absolute_path,
+            'match_start': match.start(),
+            'match_end': match.end()
+        }
+    
+    def _resolve_local_image(self, image_path: str, markdown_path: Path) -> Optional[Path]:
+        """Resolve a local image reference to an existing file, None otherwise"""
+        # Check if it's a local image
+        if not self._is_local_image(image_path):
+            return None
+        
+        # Resolve the absolute path; './' and '../' are handled by resolve()
+        absolute_path = (markdown_path.parent / image_path).resolve()
+        
+        # Check if file exists
+        if not absolute_path.is_file():
+            return None
+        return absolute_path
+    
     def _is_local_image(self, path: str) -> bool:
         """Check if an image path is local"""
         # Not a URL
-        if path.startswith(('http://', 'https://', 'ftp://', '//')):
+        if path.startswith(URL_PREFIXES):
             return False
         
         # Check for common image extensions
-        image_extensions = {'.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.bmp', '.ico'}
-        path_lower = path.lower()
-        
-        return any(path_lower.endswith(ext) for ext in image_extensions)
+        _, dot, ext = path.rpartition('.')
+        return bool(dot) and '.' + ext.lower() in IMAGE_EXTENSIONS
     
     def replace_urls(self, content: str, url_mappings: Dict[str, str]) -> str:
         """
@@ -80,17 +154,18 @@ class MarkdownProcessor:
         Returns:
             Updated markdown content
         """
-        # Sort mappings by length (descending) to handle nested paths correctly
-        sorted_mappings = sorted(url_mappings.items(), key=lambda x: len(x[0]), reverse=True)
-        
-        for original_path, public_url in sorted_mappings:
-            # Use regex to find and replace the image path in markdown syntax
-            # This pattern matches ![alt text](original_path)
-            pattern = r'(\!\[[^\]]*\]\()' + re.escape(original_path) + r'(\))'
-            replacement = r'\1' + public_url + r'\2'
-            content = re.sub(pattern, replacement, content)
-        
-        return content
+        if not url_mappings:
+            return content
+
+        # Match ![alt text](original_path) for every mapped path in one pass.
+        # Longer paths come first in the alternation so nested paths win.
+        sorted_paths = sorted(url_mappings, key=len, reverse=True)
+        pattern = r'(\!\[[^\]]*\]\()(' + '|'.join(map(re.escape, sorted_paths)) + r')(\))'
+
+        def replace(match):
+            return match.group(1) + url_mappings[match.group(2)] + match.group(3)
+
+        return re.sub(pattern, replace, content)
 
     def find_plantuml_blocks(self, content: str) -> List[Dict[str, Any]]:
         """
@@ -103,27 +178,33 @@ class MarkdownProcessor:
             List of dictionaries containing PlantUML block information
         """
         blocks = []
-        pattern = r'```plantuml\s*\n(.*?)```'
-
-        for match in re.finditer(pattern, content, re.DOTALL):
-            puml_content = match.group(1).strip()
-            diagram_name = self._extract_diagram_name(puml_content)
-            content_hash = hashlib.md5(puml_content.encode()).hexdigest()[:8]
-
-            blocks.append({
-                'content': puml_content,
-                'full_match': match.group(0),
-                'match_start': match.start(),
-                'match_end': match.end(),
-                'diagram_name': diagram_name,
-                'hash': content_hash
-            })
+        if '```plantuml' not in content:
+            return blocks
+
+        for match in self._PLANTUML_RE.finditer(content):
+            blocks.append(self._plantuml_block(match, match.group(1)))
 
         return blocks
 
+    def _plantuml_block(self, match: re.Match, source: str) -> Dict[str, Any]:
+        """Build the block info for a PlantUML code block match"""
+        puml_content = source.strip()
+        diagram_name = self._extract_diagram_name(puml_content)
+        content_hash = hashlib.blake2b(puml_content.encode('utf-8'), digest_size=8).hexdigest()
+
+        return {
+            'content': puml_content,
+            'source': wrap_plantuml(puml_content),
+            'full_match': match.group(0),
+            'match_start': match.start(),
+            'match_end': match.end(),
+            'diagram_name': diagram_name,
+            'hash': content_hash
+        }
+
     def _extract_diagram_name(self, puml_content: str) -> str:
         """Extract diagram name from @startuml directive"""
-        match = re.search(r'@startuml\s+(\S+)', puml_content)
+        match = self._STARTUML_RE.search(puml_content)
         if match:
             return match.group(1)
         return "diagram"
@@ -146,7 +227,7 @@ class MarkdownProcessor:
             body = content
 
         body = body.replace('—', '-')
-        body = re.sub(r'(?m)^[ \t]*---[ \t]*\n', '', body)
+        body = self._DIVIDER_RE.sub('', body)
 
         return head + body
 
@@ -162,5 +243,41 @@ class MarkdownProcessor:
         Returns:
             Updated markdown content
         """
-        image_markdown = f'![{block["diagram_name"]}]({image_path})'
-        return content.replace(block['full_match'], image_markdown)
\ No newline at end of file
+        return self.replace_plantuml_blocks(content, [(block, image_path)])
+
+    def replace_plantuml_blocks(self, content: str, replacements: List[Tuple[Dict[str, Any], str]]) -> str:
+        """
+        Replace several PlantUML code blocks with image references in one pass
+
+        The blocks are spliced out by their match offsets when those still
+        point at each block's text in content; blocks found in a scan of
+        other (e.g. since edited) content are replaced by their text instead.
+
+        Args:
+            content: The markdown content
+            replacements: (block, image_path) pairs, in any order
+
+        Returns:
+            Updated markdown content
+        """
+        if not replacements:
+            return content
+
+        replacements = sorted(replacements, key=lambda item: item[0]['match_start'])
+        if any(
+            content[block['match_start']:block['match_end']] != block['full_match']
+            for block, _ in replacements
+        ):
+            for block, image_path in replacements:
+                image_markdown = f'![{block["diagram_name"]}]({image_path})'
+                content = content.replace(block['full_match'], image_markdown)
+            return content
+
+        parts = []
+        position = 0
+        for block, image_path in replacements:
+            parts.append(content[position:block['match_start']])
+            parts.append(f'![{block["diagram_name"]}]({image_path})')
+            position = block['match_end']
+        parts.append(content[position:])
+        return ''.join(parts)
\ No newline at end of file
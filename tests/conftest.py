@@ -0,0 +1,23 @@
+"""
+Shared fixtures for the omelet test suite
+"""
+import importlib
+
+import pytest
+
+from omelet import ai_check, gcs_uploader
+from omelet.hashcache import JsonCache
+
+cli_module = importlib.import_module("omelet.cli")
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Point every persistent cache at a per-test directory, never ~/.omelet-cache"""
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(cli_module, "PLANTUML_CACHE_DIR", cache_dir / "puml")
+    monkeypatch.setattr(cli_module, "UPLOAD_CACHE", JsonCache(cache_dir / "uploads.json"))
+    monkeypatch.setattr(gcs_uploader, "MD5_CACHE", JsonCache(cache_dir / "md5.json"))
+    monkeypatch.setattr(ai_check, "LANG_CACHE", JsonCache(cache_dir / "lang.json"))
+    monkeypatch.setattr(ai_check, "LATEX_CACHE_DIR", cache_dir / "latex")
+    return cache_dir
@@ -0,0 +1,259 @@
+"""
+Tests for the ai_check module
+"""
+import pytest
+
+from omelet import ai_check
+from omelet.ai_check import (
+    _merge_scores,
+    _strip_environments,
+    detect_language,
+    extract_sections,
+    strip_latex,
+)
+
+
+SAMPLE_TEX = r"""\documentclass{article}
+\usepackage{amsmath}
+\title{A Study}
+\begin{document}
+\maketitle
+\begin{abstract}
+We study \emph{things} and ``stuff''.
+\end{abstract}
+\section{Introduction}
+Prior work~\cite{foo} shows 10--20\% gains % a comment
+on \textbf{bold} claims, see Figure~\ref{fig:a}.
+\begin{figure}
+\centering
+\includegraphics[width=0.5\linewidth]{a.png}
+\caption{An overview.}
+\label{fig:a}
+\end{figure}
+\subsection{Setup}
+\begin{itemize}
+\item First point
+\item Second point
+\end{itemize}
+\begin{equation}
+E = mc^2
+\end{equation}
+\section*{Related Work}
+Inline $x^2$ math and \url{https://x.org} links.
+\end{document}
+"""
+
+INTRODUCTION = (
+    "Prior work shows 10–20\\% gains \n"
+    "on bold claims, see Figure .\n\n"
+    "An overview.\n\n"
+    "Setup\n\n"
+    "- First point\n"
+    "- Second point\n\n"
+    "[formula]"
+)
+
+
+@pytest.mark.parametrize(
+    "tex, expected",
+    [
+        (r"\textbf{bold} and \emph{it}", "bold and it"),
+        (r"see~\cite{a} and \ref{b}.", "see and ."),
+        ("keep % drop\nnext", "keep \nnext"),
+        (r"10\% of ``x'' --- y -- z", "10\\% of \"x\" — y – z"),
+        (r"a\\ b & c", "a\n b c"),
+        (r"\section{Intro}Body", "Intro\nBody"),
+        (r"\begin{itemize}\item One\item Two\end{itemize}", "- One- Two"),
+        (r"\begin{equation}x\end{equation}", "[formula]"),
+        (r"\[ a \]", "[formula]"),
+        (r"\includegraphics[width=\linewidth]{a.png}", ""),
+        (r"\begin{thebibliography}{9}\bibitem{a} A\end{thebibliography}Done", "Done"),
+        (r"\gls{llm}", "LLMs"),
+        (r"\caption{\subsection*{S}}", "S"),
+        (r"\caption{a \item b}", "a - b"),
+    ],
+)
+def test_strip_latex(tex, expected):
+    assert strip_latex(tex) == expected
+
+
+def test_strip_latex_document():
+    assert strip_latex(SAMPLE_TEX) == (
+        'A Study\n\nabstract\nWe study things and "stuff".\nabstract\n\n'
+        "Introduction\n\n" + INTRODUCTION + "\n\n"
+        "Related Work\n\nInline $x^2$ math and https://x.org links."
+    )
+
+
+def test_extract_sections():
+    assert extract_sections(SAMPLE_TEX) == {
+        "introduction": INTRODUCTION,
+        "related work": "Inline $x^2$ math and https://x.org links.",
+        "abstract": 'We study things and "stuff".',
+    }
+
+
+def test_extract_sections_stops_at_next_section():
+    tex = r"\section{A}first\section*{B}second\end{document}ignored"
+    assert extract_sections(tex) == {"a": "first", "b": "second"}
+
+
+@pytest.mark.parametrize(
+    "tex, expected",
+    [
+        (r"\begin{itemize}[label=-]\item a\end{itemize} see [1]", r"\item a see [1]"),
+        (r"\begin{itemize}\item a\end{itemize} see [1]", r"\item a see [1]"),
+        (r"a\begin{align*}x&=1\end{align*}b", "a[formula]b"),
+        (r"a\begin{equation}x", r"a\begin{equation}x"),
+        (r"\begin{tabular}{lc}x & y\end{tabular}", "x & y"),
+        (r"\begin{figure}[t]\caption{C}\end{figure}", r"\caption{C}"),
+        (r"\begin{document}Hi\end{document}", "Hi"),
+        (r"A\begin{thebibliography}{9}\bibitem{a} A\end{thebibliography}B", "AB"),
+    ],
+)
+def test_strip_environments(tex, expected):
+    assert _strip_environments(tex) == expected
+
+
+def test_strip_latex_environments():
+    tex = "\\begin{itemize}\n\\item One\n\\item Two\n\\end{itemize}\n\\begin{equation}\nE\n\\end{equation}"
+    assert strip_latex(tex) == "- One\n- Two\n\n[formula]"
+
+
+@pytest.fixture
+def reparse(monkeypatch):
+    """Make any fresh parse stand out from a cached one"""
+
+    def reparse():
+        monkeypatch.setattr(ai_check, "strip_latex", lambda text: "reparsed")
+        monkeypatch.setattr(ai_check, "extract_sections", lambda text: {"reparsed": text})
+
+    return reparse
+
+
+def test_latex_cache_hit(tmp_path, reparse):
+    tex = tmp_path / "paper.tex"
+    tex.write_text(SAMPLE_TEX, encoding="utf-8")
+    assert ai_check.load_stripped(tex) == strip_latex(SAMPLE_TEX)
+    assert ai_check.load_sections(tex) == extract_sections(SAMPLE_TEX)
+    stripped, sections = strip_latex(SAMPLE_TEX), extract_sections(SAMPLE_TEX)
+
+    reparse()
+    assert ai_check.load_stripped(tex) == stripped
+    assert ai_check.load_sections(tex) == sections
+
+
+def test_latex_cache_miss_when_file_changes(tmp_path, reparse):
+    tex = tmp_path / "paper.tex"
+    tex.write_text(r"\section{A}old", encoding="utf-8")
+    assert ai_check.load_sections(tex) == {"a": "old"}
+
+    reparse()
+    tex.write_text(r"\section{A}newer", encoding="utf-8")
+    assert ai_check.load_sections(tex) == {"reparsed": r"\section{A}newer"}
+
+
+def test_latex_cache_miss_when_parser_changes(tmp_path, reparse, monkeypatch):
+    tex = tmp_path / "paper.tex"
+    tex.write_text(r"\section{A}text", encoding="utf-8")
+    ai_check.load_stripped(tex)
+
+    reparse()
+    monkeypatch.setattr(ai_check, "_parser_version", lambda: "changed")
+    assert ai_check.load_stripped(tex) == "reparsed"
+
+
+def test_latex_cache_one_file_per_source(tmp_path, cache_dir):
+    for name in ("a.tex", "b.tex"):
+        tex = tmp_path / name
+        tex.write_text(r"\section{A}text", encoding="utf-8")
+        ai_check.load_sections(tex)
+        ai_check.load_stripped(tex)
+
+    assert len(list((cache_dir / "latex").iterdir())) == 2
+
+
+def test_latex_cache_ignores_corrupt_file(tmp_path, cache_dir):
+    tex = tmp_path / "paper.tex"
+    tex.write_text(r"\section{A}text", encoding="utf-8")
+    ai_check.load_sections(tex)
+    for cache_file in (cache_dir / "latex").iterdir():
+        cache_file.write_text("[", encoding="utf-8")
+
+    assert ai_check.load_sections(tex) == {"a": "text"}
+
+
+@pytest.fixture
+def detections(monkeypatch):
+    """Samples sent to the language API, which answers French"""
+    samples = []
+
+    def detect(sample, token):
+        samples.append(sample)
+        return "fr", "French"
+
+    monkeypatch.setattr(ai_check, "_detect_language_sample", detect)
+    return samples
+
+
+def test_language_cache_hit(detections):
+    assert detect_language("Bonjour tout le monde", "token") == ("fr", "French")
+    assert detect_language("Bonjour tout le monde", "token") == ("fr", "French")
+    assert detections == ["Bonjour tout le monde"]
+
+
+def test_language_cache_keyed_by_sample(detections):
+    head = "x" * ai_check.LANG_SAMPLE_SIZE
+    detect_language(head + "one ending", "token")
+    detect_language(head + "another ending", "token")
+    detect_language("something else", "token")
+    assert detections == [head, "something else"]
+
+
+def test_language_cache_skips_short_samples(detections):
+    detect_language("ab", "token")
+    detect_language("ab", "token")
+    assert len(detections) == 2
+
+
+def test_language_failures_not_cached(monkeypatch, detections):
+    def fail(sample, token):
+        raise ConnectionError("offline")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(ai_check, "_detect_language_sample", fail)
+        assert detect_language("Bonjour tout le monde", "token") == ("en", "English")
+    assert detect_language("Bonjour tout le monde", "token") == ("fr", "French")
+    assert detections == ["Bonjour tout le monde"]
+
+
+def _result(score, *chunk_texts):
+    return {"data": {"value": {"aiScore": score, "chunks": [{"text": t} for t in chunk_texts]}}}
+
+
+def test_merge_scores_single_result_unchanged():
+    result = _result(0.3, "a")
+    assert _merge_scores([result], ["a"]) is result
+
+
+def test_merge_scores_weights_new_text_and_drops_overlap_chunks():
+    # The second piece repeats the first one's last 2 chars ("xx"), so each
+    # piece adds 6 new chars and the chunk starting in "xx" is a repeat
+    merged = _merge_scores(
+        [_result(1.0, "aaaa"), _result(0.0, "xxbb", "bbbb")],
+        ["aaaaxx", "xxbbbbbb"],
+        overlap=2,
+    )
+    value = merged["data"]["value"]
+    assert value["aiScore"] == 0.5
+    assert value["chunks"] == [{"text": "aaaa"}, {"text": "bbbb"}]
+
+
+def test_merge_scores_propagates_errors():
+    error = {"error": "Unauthorized", "status_code": 401}
+    assert _merge_scores([_result(1.0), error], ["a", "b"]) is error
+
+
+def test_chunk_text_overlaps():
+    pieces = ai_check._chunk_text("abcdefghij", size=4, overlap=1)
+    assert pieces == ["abcd", "defg", "ghij"]
@@ -0,0 +1,146 @@
+"""
+Tests for the CLI's PlantUML rendering and upload caches
+"""
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from omelet import image_metadata
+from omelet.markdown_processor import MarkdownProcessor
+
+cli_module = importlib.import_module("omelet.cli")
+
+
+class FakeResponse:
+    """Stands in for a streamed requests.Response"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        yield b"rendered png"
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """PlantUML sources sent to the render service"""
+    sources = []
+
+    def post(url, puml_bytes, timeout):
+        sources.append(puml_bytes)
+        return FakeResponse()
+
+    monkeypatch.setattr(cli_module, "_post_plantuml", post)
+    return sources
+
+
+def test_render_cache_shared_by_puml_and_buildmarkdown(tmp_path, renders):
+    # Without @startuml/@enduml, so the two paths see differently wrapped text
+    diagram = "A -> B"
+    result = CliRunner().invoke(
+        cli_module.cli, ["puml", "--string", diagram, "--output", str(tmp_path / "diagram.png")]
+    )
+    assert result.exit_code == 0, result.output
+
+    (tmp_path / "post").mkdir()
+    blocks = MarkdownProcessor().find_plantuml_blocks(f"```plantuml\n{diagram}\n```\n")
+    rendered = list(cli_module.render_plantuml_blocks(blocks, tmp_path / "post"))
+
+    assert len(renders) == 1
+    assert [filename for _, filename in rendered] == [f"diagram-{blocks[0]['hash']}.png"]
+    assert (tmp_path / "post" / rendered[0][1]).read_bytes() == b"rendered png"
+
+
+class FakeUploader:
+    """Records uploads instead of sending them"""
+
+    bucket_name = "bucket"
+
+    def __init__(self):
+        self.uploads = []
+
+    def upload_image(self, image_path, folder):
+        self.uploads.append((image_path.name, folder))
+        return f"https://cdn/{folder}/{image_path.name}"
+
+
+@pytest.fixture
+def scrubs(monkeypatch):
+    """Images scrubbed during a test; metadata stripping is a no-op"""
+    scrubbed = []
+    monkeypatch.setattr(image_metadata, "strip_image_metadata", lambda path: False)
+    monkeypatch.setattr(image_metadata, "scrub_watermark", lambda path: scrubbed.append(path.name))
+    return scrubbed
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / "a.png"
+    path.write_bytes(b"png")
+    return path
+
+
+def test_upload_cache_hit(image, scrubs):
+    uploader = FakeUploader()
+    first = cli_module._prepare_and_upload(uploader, image, "post")
+    second = cli_module._prepare_and_upload(uploader, image, "post")
+
+    assert first == second == "https://cdn/post/a.png"
+    assert uploader.uploads == [("a.png", "post")]
+
+
+def test_upload_cache_miss_when_file_changes(image, scrubs):
+    uploader = FakeUploader()
+    cli_module._prepare_and_upload(uploader, image, "post")
+    image.write_bytes(b"edited png")
+    cli_module._prepare_and_upload(uploader, image, "post")
+
+    assert len(uploader.uploads) == 2
+
+
+def test_upload_cache_keyed_by_target_and_folder(image, scrubs):
+    uploader = FakeUploader()
+    cli_module._prepare_and_upload(uploader, image, "post")
+    cli_module._prepare_and_upload(uploader, image, "other")
+    other_bucket = FakeUploader()
+    other_bucket.bucket_name = "other"
+    cli_module._prepare_and_upload(other_bucket, image, "post")
+
+    assert uploader.uploads == [("a.png", "post"), ("a.png", "other")]
+    assert other_bucket.uploads == [("a.png", "post")]
+
+
+def test_upload_cache_miss_when_scrub_requested(image, scrubs):
+    uploader = FakeUploader()
+    for scrub in (False, True, True, False):
+        cli_module._prepare_and_upload(uploader, image, "post", scrub)
+
+    assert scrubs == ["a.png"]
+    assert len(uploader.uploads) == 2
+
+
+def test_stop_uploads_cancels_queued_and_keeps_finished():
+    executor = ThreadPoolExecutor(max_workers=1)
+    release = threading.Event()
+    started = {Path("/done.png"): executor.submit(lambda: "https://cdn/done.png")}
+    started[Path("/done.png")].result()
+    started[Path("/running.png")] = executor.submit(release.wait)
+    started[Path("/queued.png")] = executor.submit(lambda: "https://cdn/queued.png")
+    images = [{"path": path, "original": path.name} for path in started]
+    url_mappings = {}
+
+    cli_module._stop_uploads(executor, started, images, url_mappings)
+    release.set()
+
+    assert started[Path("/queued.png")].cancelled()
+    assert url_mappings == {"done.png": "https://cdn/done.png"}
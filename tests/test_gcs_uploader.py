@@ -0,0 +1,83 @@
+"""
+Tests for the Google Cloud Storage uploader and its MD5 cache
+"""
+import base64
+import hashlib
+from unittest import mock
+
+import pytest
+from google.api_core.exceptions import Forbidden, NotFound
+
+from omelet.gcs_uploader import EXISTING_CHECK_MIN_SIZE, GCSUploader, file_md5
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / "a.png"
+    path.write_bytes(b"png")
+    return path
+
+
+def test_file_md5(image):
+    assert file_md5(image) == hashlib.md5(b"png").digest()
+    assert file_md5(image, b"png") == hashlib.md5(b"png").digest()
+
+
+def test_file_md5_cache_hit(image):
+    file_md5(image)
+    # A hit returns the recorded digest without hashing the data again
+    assert file_md5(image, b"ignored") == hashlib.md5(b"png").digest()
+
+
+def test_file_md5_cache_miss_when_file_changes(image):
+    file_md5(image)
+    image.write_bytes(b"edited png")
+    assert file_md5(image) == hashlib.md5(b"edited png").digest()
+
+
+@pytest.fixture
+def big_image(tmp_path):
+    path = tmp_path / "big.png"
+    path.write_bytes(b"x" * EXISTING_CHECK_MIN_SIZE)
+    return path
+
+
+def _gcs_uploader(blob, predefined_acl):
+    uploader = GCSUploader.__new__(GCSUploader)
+    uploader.bucket_name = "bucket"
+    uploader.bucket = mock.Mock()
+    uploader.bucket.blob.return_value = blob
+    uploader.predefined_acl = predefined_acl
+    return uploader
+
+
+@pytest.mark.parametrize("predefined_acl", ["publicRead", None])
+def test_gcs_skips_identical_blob(big_image, predefined_acl):
+    blob = mock.Mock()
+    blob.md5_hash = base64.b64encode(hashlib.md5(big_image.read_bytes()).digest()).decode()
+    url = _gcs_uploader(blob, predefined_acl).upload_image(big_image, "post")
+
+    assert url == "https://storage.googleapis.com/bucket/public/blog/post/big.png"
+    blob.upload_from_string.assert_not_called()
+    if predefined_acl:
+        blob.acl.save_predefined.assert_called_once_with(predefined_acl)
+    else:
+        blob.acl.save_predefined.assert_not_called()
+
+
+def test_gcs_uploads_changed_blob(big_image):
+    blob = mock.Mock()
+    blob.md5_hash = base64.b64encode(hashlib.md5(b"other").digest()).decode()
+    _gcs_uploader(blob, "publicRead").upload_image(big_image, "post")
+
+    blob.upload_from_string.assert_called_once()
+    assert blob.upload_from_string.call_args.kwargs["predefined_acl"] == "publicRead"
+
+
+@pytest.mark.parametrize("error", [NotFound("missing"), Forbidden("no storage.objects.get")])
+def test_gcs_uploads_when_blob_unreadable(big_image, error):
+    blob = mock.Mock()
+    blob.reload.side_effect = error
+    _gcs_uploader(blob, "publicRead").upload_image(big_image, "post")
+
+    blob.upload_from_string.assert_called_once()
@@ -0,0 +1,119 @@
+"""
+Tests for the persistent JSON cache and atomic file replacement
+"""
+import json
+import os
+
+from omelet.hashcache import JsonCache, file_stamp, replace_file
+
+
+def test_get_missing(tmp_path):
+    cache = JsonCache(tmp_path / "cache.json")
+    assert cache.get("key") is None
+    assert not (tmp_path / "cache.json").exists()
+
+
+def test_get_requires_matching_stamp(tmp_path):
+    cache = JsonCache(tmp_path / "cache.json")
+    cache.set("key", "value", [1, 2])
+
+    assert cache.get("key", [1, 2]) == "value"
+    assert cache.get("key", [1, 3]) is None
+    assert cache.get("key") is None
+
+
+def test_save_and_reload(tmp_path):
+    path = tmp_path / "nested" / "cache.json"
+    cache = JsonCache(path)
+    cache.set("key", {"url": "https://cdn/a.png"}, [1, 2])
+    cache.save()
+
+    assert JsonCache(path).get("key", [1, 2]) == {"url": "https://cdn/a.png"}
+
+
+def test_save_without_changes_writes_nothing(tmp_path):
+    cache = JsonCache(tmp_path / "cache.json")
+    cache.get("key")
+    cache.save()
+    assert not (tmp_path / "cache.json").exists()
+
+
+def test_read_only_run_writes_nothing(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = JsonCache(path)
+    cache.set("key", 1, [1])
+    cache.save()
+    before = path.stat().st_mtime_ns
+
+    reader = JsonCache(path)
+    assert reader.get("key", [1]) == 1
+    reader.set("key", 1, [1])
+    reader.save()
+    assert path.stat().st_mtime_ns == before
+
+
+def test_corrupt_file_reads_as_empty(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text("{not json", encoding="utf-8")
+    cache = JsonCache(path)
+
+    assert cache.get("key") is None
+    cache.set("key", 1)
+    cache.save()
+    assert JsonCache(path).get("key") == 1
+
+
+def test_save_keeps_most_recently_stored(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = JsonCache(path, max_entries=3)
+    for key in ("a", "b", "c", "d"):
+        cache.set(key, key)
+    cache.set("b", "b2")
+    cache.save()
+
+    assert list(json.loads(path.read_text(encoding="utf-8"))) == ["c", "d", "b"]
+
+
+def test_save_merges_other_writers(tmp_path):
+    path = tmp_path / "cache.json"
+    first, second = JsonCache(path), JsonCache(path)
+    first.set("a", 1)
+    second.set("b", 2)
+    first.save()
+    second.save()
+
+    reloaded = JsonCache(path)
+    assert (reloaded.get("a"), reloaded.get("b")) == (1, 2)
+
+
+def test_file_stamp_changes_with_content(tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_text("one", encoding="utf-8")
+    before = file_stamp(path)
+    path.write_text("three", encoding="utf-8")
+
+    assert file_stamp(path) != before
+
+
+def test_replace_file(tmp_path):
+    path = tmp_path / "file.txt"
+    replace_file(path, "text")
+    assert path.read_text(encoding="utf-8") == "text"
+
+    replace_file(path, [b"chunk", b"ed"])
+    assert path.read_bytes() == b"chunked"
+    assert os.listdir(tmp_path) == ["file.txt"]
+
+
+def test_replace_file_keeps_links(tmp_path):
+    target = tmp_path / "target.txt"
+    target.write_text("old", encoding="utf-8")
+    symlink = tmp_path / "symlink.txt"
+    symlink.symlink_to(target)
+    hardlink = tmp_path / "hardlink.txt"
+    os.link(target, hardlink)
+
+    replace_file(symlink, b"new")
+    assert symlink.is_symlink()
+    assert hardlink.read_bytes() == target.read_bytes() == b"new"
+
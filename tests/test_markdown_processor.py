@@ -0,0 +1,120 @@
+"""
+Tests for MarkdownProcessor scanning and replacement helpers
+"""
+import pytest
+
+from omelet.markdown_processor import MarkdownProcessor
+
+
+DOC = """# Title
+
+![Local](images/a.png)
+
+```plantuml
+@startuml flow
+A -> B
+' ![Not an image](images/a.png)
+@enduml
+```
+
+![Remote](https://example.com/b.png) and ![Missing](images/missing.png)
+
+```plantuml
+A -> C
+```
+
+![Again](images/a.png)
+"""
+
+
+@pytest.fixture
+def processor():
+    return MarkdownProcessor()
+
+
+@pytest.fixture
+def markdown_path(tmp_path):
+    (tmp_path / "images").mkdir()
+    (tmp_path / "images" / "a.png").write_bytes(b"png")
+    path = tmp_path / "post.md"
+    path.write_text(DOC, encoding="utf-8")
+    return path
+
+
+def test_find_assets(processor, markdown_path):
+    blocks, images = processor.find_assets(DOC, markdown_path)
+
+    assert [block["diagram_name"] for block in blocks] == ["flow", "diagram"]
+    assert blocks[0]["content"] == "@startuml flow\nA -> B\n' ![Not an image](images/a.png)\n@enduml"
+    assert [image["alt_text"] for image in images] == ["Local", "Again"]
+    assert {image["path"] for image in images} == {markdown_path.parent / "images" / "a.png"}
+    for item in blocks + images:
+        assert item["match_start"] < item["match_end"]
+
+
+def test_find_assets_matches_separate_scans(processor, markdown_path):
+    blocks, images = processor.find_assets(DOC, markdown_path)
+    assert blocks == processor.find_plantuml_blocks(DOC)
+    assert [image["alt_text"] for image in processor.find_local_images(DOC, markdown_path)] == [
+        "Local",
+        "Not an image",
+        "Again",
+    ]
+
+
+def test_find_assets_without_assets(processor, markdown_path):
+    assert processor.find_assets("Just prose.", markdown_path) == ([], [])
+
+
+def test_replace_urls(processor):
+    content = "![a](img/a.png) ![b](img/a.png.bak/a.png) ![c](img/c.png) [a](img/a.png)"
+    result = processor.replace_urls(
+        content,
+        {"img/a.png": "https://cdn/a.png", "img/a.png.bak/a.png": "https://cdn/nested.png"},
+    )
+    assert result == (
+        "![a](https://cdn/a.png) ![b](https://cdn/nested.png) ![c](img/c.png) [a](img/a.png)"
+    )
+
+
+def test_replace_urls_escapes_paths(processor):
+    content = "![x](a+b (1).png) ![y](aab (1)png)"
+    assert processor.replace_urls(content, {"a+b (1).png": "u"}) == "![x](u) ![y](aab (1)png)"
+
+
+def test_replace_urls_without_mappings(processor):
+    assert processor.replace_urls("![a](a.png)", {}) == "![a](a.png)"
+
+
+def test_replace_plantuml_blocks(processor):
+    blocks = processor.find_plantuml_blocks(DOC)
+    result = processor.replace_plantuml_blocks(DOC, [(blocks[1], "two.png"), (blocks[0], "one.png")])
+
+    assert "```plantuml" not in result
+    assert result == (
+        DOC.replace(blocks[0]["full_match"], "![flow](one.png)")
+        .replace(blocks[1]["full_match"], "![diagram](two.png)")
+    )
+
+
+def test_replace_plantuml_blocks_without_replacements(processor):
+    assert processor.replace_plantuml_blocks(DOC, []) is DOC
+
+
+def test_replace_plantuml_with_image_one_at_a_time(processor):
+    # Offsets of the second block are stale once the first one is replaced
+    blocks = processor.find_plantuml_blocks(DOC)
+    content = processor.replace_plantuml_with_image(DOC, blocks[0], "one.png")
+    content = processor.replace_plantuml_with_image(content, blocks[1], "two.png")
+
+    assert content == processor.replace_plantuml_blocks(
+        DOC, [(blocks[0], "one.png"), (blocks[1], "two.png")]
+    )
+
+
+def test_replace_plantuml_with_image_in_edited_content(processor):
+    blocks = processor.find_plantuml_blocks(DOC)
+    edited = "Intro\n" + DOC
+    result = processor.replace_plantuml_with_image(edited, blocks[1], "two.png")
+
+    assert result == edited.replace(blocks[1]["full_match"], "![diagram](two.png)")